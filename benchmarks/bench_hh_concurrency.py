@@ -0,0 +1,77 @@
+"""Бенчмарк параллельности HHSupportAnalyzer на локальной замене HH.
+
+Несколько крупных работодателей с десятками страниц вакансий идут вместе
+с мелкими. Показывает, не ждут ли мелкие компании крупные и сколько
+запросов одновременно доходит до сервера.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_hh_concurrency
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.hh_stand import HHStand, isolated_cache, use_stand
+from src.enrich_jobs import HHSupportAnalyzer
+
+LARGE_PREFIX = 'Крупная'
+
+
+async def run(args):
+    stand = await HHStand(
+        port=args.port,
+        latency=args.latency,
+        per_page_items=20,
+        pages_for=lambda key: (
+            args.large_pages if key.startswith(LARGE_PREFIX) else 1
+        )
+    ).start()
+    names = [f'{LARGE_PREFIX}{index}' for index in range(args.large)] + [
+        f'Малая{index}' for index in range(args.small)
+    ]
+    finished = {}
+    started = time.monotonic()
+    try:
+        with isolated_cache():
+            async with HHSupportAnalyzer(
+                max_concurrent=args.max_concurrent,
+                request_timeout=25,
+                requests_per_second=1000
+            ) as analyzer:
+                use_stand(analyzer, stand)
+
+                async def analyze(name):
+                    await analyzer.analyze_company(name, '1', '')
+                    finished[name] = time.monotonic() - started
+
+                await asyncio.gather(*map(analyze, names))
+    finally:
+        await stand.stop()
+    large = [finished[name] for name in names[:args.large]]
+    small = sorted(finished[name] for name in names[args.large:])
+    print(f'всего: {time.monotonic() - started:.2f} с')
+    print(f'крупные: max {max(large):.2f} с')
+    print(
+        f'мелкие: медиана {statistics.median(small):.2f} с, '
+        f'max {small[-1]:.2f} с'
+    )
+    print(
+        f'пик параллельности на сервере: {stand.peak_in_flight}, '
+        f'запросы: {stand.counts}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--large', type=int, default=4)
+    parser.add_argument('--large-pages', type=int, default=40)
+    parser.add_argument('--small', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8781)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
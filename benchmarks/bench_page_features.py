@@ -0,0 +1,123 @@
+"""Бенчмарк разбора главных страниц сайтов в extract_page_features.
+
+Считает, сколько страниц в секунду проходят parse_page и
+extract_page_features на каждом бэкенде разборщика, а также полный
+analyze_homepage, на фиксированном корпусе fixtures/pages/*.html.
+Для сравнения «до» замеряется прежний способ: BeautifulSoup по всей
+странице, поиск e-mail и признаков по сырому HTML и str(soup).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_page_features
+"""
+import argparse
+from pathlib import Path
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from src.enrich_sites import (
+    analyze_homepage,
+    CHAT_INDICATORS,
+    EMAIL_PATTERN,
+    extract_page_features,
+    FAQ_KEYWORDS,
+    JOB_KEYWORDS,
+    MESSENGERS,
+    SUPPORT_KEYWORDS
+)
+from src.html_parser import PARSER_BACKENDS, lxml_html, parse_page
+
+CORPUS = Path(__file__).parent / 'fixtures' / 'pages'
+URL = 'https://example.ru/'
+
+
+def load_pages(path=CORPUS):
+    """Загружает страницы корпуса в порядке имён файлов."""
+    return [
+        page.read_text(encoding='utf-8')
+        for page in sorted(path.glob('*.html'))
+    ]
+
+
+def first_link(soup, keywords, limit):
+    for link in soup.find_all('a', href=True, limit=limit):
+        if any(
+            keyword in link.get_text(strip=True).lower()
+            for keyword in keywords
+        ):
+            return urljoin(URL, link['href'])
+    return ''
+
+
+def legacy_features(html):
+    """Прежнее извлечение признаков главной страницы."""
+    soup = BeautifulSoup(html, 'html.parser')
+    html_lower = html.lower()
+    all_emails = EMAIL_PATTERN.findall(html) + [
+        link['href'][7:] for link in soup.find_all('a', href=True)
+        if link['href'].startswith('mailto:')
+    ]
+    return {
+        'page_text': soup.get_text(separator=' ', strip=True)[:5000],
+        'support_email': next((
+            email for email in all_emails
+            if email.lower().startswith(('support@', 'help@'))
+        ), all_emails[0] if all_emails else ''),
+        'has_contact_form': bool(soup.find_all('form')) and any(
+            keyword in str(soup).lower()
+            for keyword in ('form', 'contact', 'обратн', 'заявк')
+        ),
+        'chat_vendor': next(
+            (vendor for vendor in CHAT_INDICATORS if vendor in html_lower),
+            ''
+        ),
+        'has_messengers': any(
+            messenger in html_lower for messenger in MESSENGERS
+        ),
+        'support_url': first_link(soup, SUPPORT_KEYWORDS, 100),
+        'kb_url': first_link(soup, FAQ_KEYWORDS, 50),
+        'career_link': first_link(soup, JOB_KEYWORDS, 50),
+    }
+
+
+def best_rate(count, func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    pages = load_pages()
+    contents = [html.encode('utf-8') for html in pages]
+    backends = [
+        backend for backend in PARSER_BACKENDS
+        if backend != 'lxml' or lxml_html is not None
+    ]
+    cases = [('до: BeautifulSoup', lambda: [
+        legacy_features(html) for html in pages
+    ])]
+    for backend in backends:
+        cases.append((f'extract_page_features, {backend}', lambda b=backend: [
+            extract_page_features(parse_page(html, b), URL) for html in pages
+        ]))
+        cases.append((f'analyze_homepage, {backend}', lambda b=backend: [
+            analyze_homepage(content, 'utf-8', URL, b) for content in contents
+        ]))
+    print(
+        f'страниц: {len(pages)}, '
+        f'объём: {sum(map(len, contents)) / 1024:.0f} КБ'
+    )
+    for name, func in cases:
+        rate = best_rate(len(pages), func, args.repeat)
+        print(f'{name:40} {rate:>10,.1f} страниц/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Микробенчмарк фильтров заголовков вакансий со страниц сайтов.
+
+Прогоняет заголовки из fixtures/site_titles.txt (навигация, заголовки
+разделов и вакансии со страниц карьеры) через SUPPORT_JOB_REGEX,
+VACANCY_EXCLUDE_REGEX и clean_and_filter_vacancies.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_title_filters
+"""
+import argparse
+from pathlib import Path
+import time
+
+from src.enrich_sites import (
+    clean_and_filter_vacancies,
+    SUPPORT_JOB_REGEX,
+    VACANCY_EXCLUDE_REGEX
+)
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'site_titles.txt'
+
+
+def load_titles(path=FIXTURE):
+    """Загружает заголовки, по одному на строку."""
+    return path.read_text(encoding='utf-8').splitlines()
+
+
+def best_rate(count, func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    titles = load_titles()
+    lowered = [title.lower() for title in titles]
+    cases = (
+        ('SUPPORT_JOB_REGEX', lambda: [
+            SUPPORT_JOB_REGEX.search(title) for title in lowered
+        ]),
+        ('VACANCY_EXCLUDE_REGEX', lambda: [
+            VACANCY_EXCLUDE_REGEX.search(title) for title in lowered
+        ]),
+        ('clean_and_filter_vacancies', lambda: (
+            clean_and_filter_vacancies(titles)
+        )),
+    )
+    print(
+        f'заголовков: {len(titles)}, оставлено как вакансии: '
+        f'{len(clean_and_filter_vacancies(titles))}'
+    )
+    for name, func in cases:
+        rate = best_rate(len(titles), func, args.repeat)
+        print(f'{name:28} {rate:>12,.0f} заголовков/с')
+
+
+if __name__ == '__main__':
+    main()
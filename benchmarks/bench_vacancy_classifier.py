@@ -0,0 +1,79 @@
+"""Бенчмарк классификации вакансий HH в HHSupportAnalyzer.
+
+Считает, сколько вакансий в секунду проходят support_vacancy,
+analyze_vacancy_quality, select_support_vacancies и пакетная
+classify_vacancies_frame на выдаче HH из fixtures/hh_vacancies.json.
+Фикстура повторяется --copies раз; повторы выгодны пакетной разметке,
+которая проверяет каждый различный текст один раз.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_vacancy_classifier
+"""
+import argparse
+import json
+from pathlib import Path
+import time
+
+import pandas as pd
+
+from src.enrich_jobs import HHSupportAnalyzer
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'hh_vacancies.json'
+
+
+def load_items(path=FIXTURE):
+    """Загружает вакансии в формате выдачи api.hh.ru."""
+    with open(path, encoding='utf-8') as fixture:
+        return json.load(fixture)['items']
+
+
+def snippet_text(item):
+    snippet = item.get('snippet') or {}
+    return (
+        f"{snippet.get('requirement') or ''} "
+        f"{snippet.get('responsibility') or ''}"
+    )
+
+
+def best_rate(count, func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--copies', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    items = load_items() * args.copies
+    rows = [(item['name'], snippet_text(item)) for item in items]
+    frame = pd.DataFrame(rows, columns=('title', 'snippet'))
+    analyzer = HHSupportAnalyzer()
+    cases = (
+        ('support_vacancy', lambda: [
+            analyzer.support_vacancy(title, snippet)
+            for title, snippet in rows
+        ]),
+        ('analyze_vacancy_quality', lambda: [
+            analyzer.analyze_vacancy_quality(title, snippet)
+            for title, snippet in rows
+        ]),
+        ('select_support_vacancies', lambda: (
+            analyzer.select_support_vacancies(items)
+        )),
+        ('classify_vacancies_frame', lambda: (
+            analyzer.classify_vacancies_frame(frame)
+        )),
+    )
+    print(f'вакансий: {len(items)}')
+    for name, func in cases:
+        rate = best_rate(len(items), func, args.repeat)
+        print(f'{name:26} {rate:>12,.0f} вакансий/с')
+
+
+if __name__ == '__main__':
+    main()
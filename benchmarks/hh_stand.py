@@ -0,0 +1,160 @@
+"""Локальная замена api.hh.ru для бенчмарков HHSupportAnalyzer."""
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from src import cache
+
+TITLES = (
+    'Оператор call-центра', 'Специалист технической поддержки',
+    'Менеджер по продажам', 'Разработчик Python',
+    'Оператор чата поддержки (без продаж)', 'Инженер поддержки L2',
+    'Бухгалтер', 'Консультант контакт-центра'
+)
+
+
+class HHStand:
+    """HTTP-сервер с ответами /employers и /vacancies в формате HH.
+
+    Задержка и число страниц задаются по ключу запроса (название компании
+    или ID работодателя), rps_quota включает ответы 429 с Retry-After.
+    """
+
+    def __init__(
+        self,
+        port=8780,
+        latency=0.05,
+        pages=1,
+        per_page_items=100,
+        rps_quota=None,
+        latency_for=None,
+        pages_for=None
+    ):
+        self.port = port
+        self.per_page_items = per_page_items
+        self.rps_quota = rps_quota
+        self.latency_for = latency_for or (lambda key: latency)
+        self.pages_for = pages_for or (lambda key: pages)
+        self.window = deque()
+        self.counts = {'employers': 0, 'vacancies': 0, '429': 0}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.runner = None
+
+    def _limited(self):
+        if not self.rps_quota:
+            return False
+        now = time.monotonic()
+        while self.window and now - self.window[0] > 1:
+            self.window.popleft()
+        if len(self.window) >= self.rps_quota:
+            self.counts['429'] += 1
+            return True
+        self.window.append(now)
+        return False
+
+    async def _respond(self, kind, key, payload):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self._limited():
+                return web.Response(status=429, headers={'Retry-After': '1'})
+            self.counts[kind] += 1
+            await asyncio.sleep(self.latency_for(key))
+            return web.json_response(payload())
+        finally:
+            self.in_flight -= 1
+
+    async def employers(self, request):
+        name = request.query.get('text', '')
+        return await self._respond('employers', name, lambda: {'items': [{
+            'id': name,
+            'name': name,
+            'open_vacancies': 30,
+            'type': 'company',
+            'alternate_url': f'https://hh.ru/employer/{name}'
+        }]})
+
+    async def vacancies(self, request):
+        page = int(request.query.get('page', 0))
+        text = request.query.get('text', '')
+        key = request.query.get('employer_id') or text
+        return await self._respond('vacancies', key, lambda: {
+            'items': [
+                {
+                    'id': f'{key}-{page}-{index}',
+                    'name': TITLES[index % len(TITLES)],
+                    'snippet': {
+                        'requirement': 'Работа в сменном графике 2/2, 24/7',
+                        'responsibility': (
+                            'Ответы клиентам в чате и по телефону'
+                        )
+                    },
+                    'employer': {'name': text.split(' ')[0].lower()},
+                    'alternate_url': (
+                        f'https://hh.ru/vacancy/{key}-{page}-{index}'
+                    )
+                }
+                for index in range(self.per_page_items)
+            ],
+            'pages': self.pages_for(key),
+            'page': page
+        })
+
+    async def start(self):
+        """Запускает сервер."""
+        app = web.Application()
+        app.router.add_get('/employers', self.employers)
+        app.router.add_get('/vacancies', self.vacancies)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', self.port).start()
+        return self
+
+    async def stop(self):
+        """Останавливает сервер."""
+        await self.runner.cleanup()
+
+
+class StandSession:
+    """Сессия, перенаправляющая запросы к api.hh.ru на HHStand."""
+
+    def __init__(self, session, port):
+        self.session = session
+        self.port = port
+
+    def _rewrite(self, url):
+        return f'http://127.0.0.1:{self.port}{urlsplit(url).path}'
+
+    def get(self, url, **kwargs):
+        return self.session.get(self._rewrite(url), **kwargs)
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, self._rewrite(url), **kwargs)
+
+    async def close(self):
+        await self.session.close()
+
+
+def use_stand(analyzer, stand):
+    """Направляет запросы открытого анализатора на stand."""
+    analyzer.session = StandSession(analyzer.session, stand.port)
+    return analyzer
+
+
+@contextmanager
+def isolated_cache():
+    """Подменяет каталог кэша временным, чтобы прогоны были холодными."""
+    saved = cache.CACHE_DIR
+    with tempfile.TemporaryDirectory() as directory:
+        cache.CACHE_DIR = Path(directory)
+        try:
+            yield
+        finally:
+            cache.CACHE_DIR = saved
@@ -6,15 +6,34 @@ from src.enrich_jobs import main as run_jobs
 from src.enrich_sites import main as run_sites
 from src.export_csv import main as run_export
 from src.merge_normalize import main as run_merge
+from src.retry import RetryPolicy
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+SITES_SETTINGS = {
+    'max_concurrent_companies': 20,
+    'max_in_flight': 50,
+    'max_per_host': 2,
+    'requests_per_second': 20,
+    'parser_backend': 'lxml',
+}
+HH_MAX_RETRIES_PER_RUN = 500
+SITES_MAX_ATTEMPTS = 2
+SITES_MAX_RETRIES_PER_RUN = 200
+
 
 def run_all():
     """Запускает пайплайн."""
     async def run_parallel():
-        task1 = asyncio.create_task(run_jobs())
-        task2 = asyncio.create_task(run_sites())
+        task1 = asyncio.create_task(run_jobs(
+            retry_policy=RetryPolicy(max_retries=HH_MAX_RETRIES_PER_RUN)
+        ))
+        task2 = asyncio.create_task(run_sites(
+            **SITES_SETTINGS, retry_policy=RetryPolicy(
+                max_attempts=SITES_MAX_ATTEMPTS,
+                max_retries=SITES_MAX_RETRIES_PER_RUN
+            )
+        ))
         await asyncio.gather(task1, task2)
     try:
         asyncio.run(run_parallel())
@@ -4,6 +4,7 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 
 RAW_DIR = PROJECT_ROOT / 'data' / 'raw'
+CACHE_DIR = PROJECT_ROOT / 'data' / 'cache'
 FILENAME_FOR_CANDIDATES = 'candidates.csv'
 FILENAME_FOR_PARSE_SITES = 'sites_analysis.csv'
 FILENAME_FOR_PARSE_JOBS = 'jobs_analysis.csv'
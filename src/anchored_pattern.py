@@ -0,0 +1,81 @@
+import re
+
+
+FREE_CHARS = r'[\s\d-]'
+FALLBACK_SPAN = 256
+MIN_CHARS_PER_ANCHOR = 512
+
+
+def _budget_regex(budget):
+    return re.compile(
+        rf'(?:{FREE_CHARS}*[^\s\d-]){{0,{budget}}}{FREE_CHARS}*'
+    )
+
+
+def _window_start(text, position, regex):
+    start = max(0, position - FALLBACK_SPAN)
+    while True:
+        span = regex.match(text[start:position][::-1]).end()
+        if span < position - start or not start:
+            return position - span
+        start = max(0, start - FALLBACK_SPAN)
+
+
+def _window_end(text, position, regex):
+    return regex.match(text, position).end()
+
+
+class AnchoredPattern:
+    """Регулярное выражение, которое проверяется только возле якоря.
+
+    Каждое совпадение шаблона обязано содержать якорное слово, а до и
+    после якоря может занимать не больше before и after символов, кроме
+    пробелов, цифр и дефисов (их захватывают неограниченные повторы).
+    Поэтому поиск в окнах вокруг якорей дает то же совпадение, что и
+    поиск по всему тексту.
+    """
+
+    def __init__(
+        self, pattern, anchor, before=0, after=0, anchor_pattern=None
+    ):
+        self.regex = re.compile(pattern)
+        self.anchor = anchor
+        self.before_regex = _budget_regex(before)
+        self.after_regex = _budget_regex(after)
+        self.anchor_regex = re.compile(
+            anchor_pattern
+        ) if anchor_pattern else None
+
+    def _anchor_end(self, text, position):
+        if self.anchor_regex is None:
+            return position + len(self.anchor)
+        match = self.anchor_regex.match(text, position)
+        return match.end() if match else None
+
+    def windows(self, text):
+        """Возвращает непересекающиеся окна вокруг якорей."""
+        windows = []
+        position = text.find(self.anchor)
+        while position != -1:
+            anchor_end = self._anchor_end(text, position)
+            if anchor_end is not None:
+                end = _window_end(text, anchor_end, self.after_regex)
+                if windows and position < windows[-1][1]:
+                    windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+                else:
+                    start = _window_start(text, position, self.before_regex)
+                    if windows and start <= windows[-1][1]:
+                        windows[-1] = (windows[-1][0], end)
+                    else:
+                        windows.append((start, end))
+            position = text.find(self.anchor, position + 1)
+        return windows
+
+    def search(self, text):
+        """Находит то же первое совпадение, что и re.search по тексту."""
+        if text.count(self.anchor) * MIN_CHARS_PER_ANCHOR > len(text):
+            return self.regex.search(text)
+        for start, end in self.windows(text):
+            if match := self.regex.search(text, start, end):
+                return match
+        return None
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+
+from . import CACHE_DIR
+
+CACHEABLE_STATUSES = frozenset((200, 203, 204, 300, 301, 308, 404, 405, 410))
+
+
+class _SQLiteStore:
+    """Соединение с базой кэша с пакетной фиксацией записей.
+
+    Изменения фиксируются раз в commit_every операций и при flush или
+    close, а не на каждой записи: иначе каждое обращение к кэшу стоит
+    синхронизации с диском прямо в цикле событий. При аварийном
+    завершении теряются только последние незафиксированные записи.
+    """
+
+    def __init__(self, filename, commit_every):
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(CACHE_DIR / filename)
+        self.commit_every = max(1, commit_every)
+        self.pending = 0
+
+    def _written(self):
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """Фиксирует накопленные изменения."""
+        if self.pending:
+            self.connection.commit()
+            self.pending = 0
+
+    def close(self):
+        """Фиксирует изменения и закрывает соединение с базой."""
+        self.flush()
+        self.connection.close()
+
+
+class TTLCache(_SQLiteStore):
+    """Персистентный кэш ключ-значение в SQLite с временем жизни записей.
+
+    При max_entries лишние записи вытесняются начиная с тех, что устареют
+    раньше всех. С preload свежие записи читаются в память при открытии,
+    и чтения дальше не обращаются к базе.
+    """
+
+    def __init__(
+        self,
+        filename,
+        default_ttl: float = 86400,
+        max_entries: int = None,
+        preload: bool = False,
+        commit_every: int = 100
+    ):
+        super().__init__(filename, commit_every)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'expires_at REAL NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS entries_expiry ON entries (expires_at)'
+        )
+        self.connection.execute(
+            'DELETE FROM entries WHERE expires_at < ?', (time.time(),)
+        )
+        self.connection.commit()
+        self.size = self.connection.execute(
+            'SELECT COUNT(*) FROM entries'
+        ).fetchone()[0]
+        self.memory = None
+        self.stats = {
+            'loaded': 0, 'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0
+        }
+        if max_entries is not None and self.size > max_entries:
+            self._evict()
+            self.connection.commit()
+        if preload:
+            self.memory = {
+                key: (json.loads(value), expires_at)
+                for key, value, expires_at in self.connection.execute(
+                    'SELECT key, value, expires_at FROM entries'
+                )
+            }
+            self.stats['loaded'] = len(self.memory)
+
+    def get(self, key, default=None):
+        """Возвращает значение по ключу, если запись не устарела."""
+        if self.memory is not None:
+            row = self.memory.get(key)
+        else:
+            row = self.connection.execute(
+                'SELECT value, expires_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            row = row and (json.loads(row[0]), row[1])
+        if row is None or row[1] < time.time():
+            self.stats['misses'] += 1
+            return default
+        self.stats['hits'] += 1
+        return row[0]
+
+    def set(self, key, value, ttl: float = None):
+        """Сохраняет значение с заданным временем жизни."""
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        exists = self.connection.execute(
+            'SELECT 1 FROM entries WHERE key = ?', (key,)
+        ).fetchone()
+        self.connection.execute(
+            'INSERT OR REPLACE INTO entries (key, value, expires_at) '
+            'VALUES (?, ?, ?)',
+            (key, json.dumps(value, ensure_ascii=False), expires_at)
+        )
+        if self.memory is not None:
+            self.memory[key] = (value, expires_at)
+        self.size += 0 if exists else 1
+        self.stats['stored'] += 1
+        if self.max_entries is not None and self.size > self.max_entries:
+            self._evict(key)
+        self._written()
+
+    def _evict(self, keep_key=None):
+        rows = self.connection.execute(
+            'SELECT key FROM entries WHERE key IS NOT ? '
+            'ORDER BY expires_at LIMIT ?',
+            (keep_key, self.size - self.max_entries)
+        ).fetchall()
+        self.connection.executemany(
+            'DELETE FROM entries WHERE key = ?', rows
+        )
+        if self.memory is not None:
+            for (evicted_key,) in rows:
+                self.memory.pop(evicted_key, None)
+        self.size -= len(rows)
+        self.stats['evicted'] += len(rows)
+
+    def delete(self, key):
+        """Удаляет запись."""
+        deleted = self.connection.execute(
+            'DELETE FROM entries WHERE key = ?', (key,)
+        ).rowcount
+        if self.memory is not None:
+            self.memory.pop(key, None)
+        self.size -= deleted
+        self._written()
+
+
+class HTTPCache(_SQLiteStore):
+    """Дисковый кэш HTTP-ответов с повторной проверкой и вытеснением LRU.
+
+    Время последнего обращения, по которому вытесняются записи,
+    обновляется не чаще раза в touch_interval секунд.
+    """
+
+    def __init__(
+        self,
+        filename='http_cache.sqlite3',
+        ttl: float = 86400,
+        max_bytes: int = 256 * 1024 * 1024,
+        touch_interval: float = 3600,
+        commit_every: int = 100
+    ):
+        super().__init__(filename, commit_every)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, status INTEGER NOT NULL, '
+            'body BLOB NOT NULL, encoding TEXT, etag TEXT, '
+            'last_modified TEXT, size INTEGER NOT NULL, '
+            'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS responses_lru '
+            'ON responses (accessed_at)'
+        )
+        self.connection.commit()
+        self.total_bytes = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()[0]
+        self.stats = {
+            'hits': 0, 'stale': 0, 'misses': 0, 'revalidated': 0,
+            'stored': 0, 'evicted': 0
+        }
+
+    def get(self, key):
+        """Возвращает сохраненный ответ и признак его свежести."""
+        row = self.connection.execute(
+            'SELECT status, body, encoding, etag, last_modified, stored_at, '
+            'accessed_at FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        now = time.time()
+        if now - row[6] >= self.touch_interval:
+            self.connection.execute(
+                'UPDATE responses SET accessed_at = ? WHERE key = ?',
+                (now, key)
+            )
+            self._written()
+        entry = {
+            'status': row[0],
+            'body': zlib.decompress(row[1]) if row[1] else b'',
+            'encoding': row[2],
+            'etag': row[3],
+            'last_modified': row[4],
+            'fresh': row[5] + self.ttl > now
+        }
+        self.stats['hits' if entry['fresh'] else 'stale'] += 1
+        return entry
+
+    @staticmethod
+    def validators(entry):
+        """Заголовки условного запроса для устаревшей записи."""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, key):
+        """Продлевает запись после ответа 304 Not Modified."""
+        self.stats['revalidated'] += 1
+        self.connection.execute(
+            'UPDATE responses SET stored_at = ? WHERE key = ?',
+            (time.time(), key)
+        )
+        self._written()
+
+    def set(
+        self, key, status, body=b'', encoding=None, etag=None,
+        last_modified=None
+    ):
+        """Сохраняет ответ и вытесняет давно не используемые записи."""
+        compressed = zlib.compress(body) if body else b''
+        now = time.time()
+        old = self.connection.execute(
+            'SELECT size FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        self.connection.execute(
+            'INSERT OR REPLACE INTO responses (key, status, body, encoding, '
+            'etag, last_modified, size, stored_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                key, status, compressed, encoding, etag, last_modified,
+                len(compressed), now, now
+            )
+        )
+        self.total_bytes += len(compressed) - (old[0] if old else 0)
+        self.stats['stored'] += 1
+        while self.total_bytes > self.max_bytes:
+            rows = self.connection.execute(
+                'SELECT key, size FROM responses WHERE key != ? '
+                'ORDER BY accessed_at LIMIT 100', (key,)
+            ).fetchall()
+            if not rows:
+                break
+            for evicted_key, size in rows:
+                self.connection.execute(
+                    'DELETE FROM responses WHERE key = ?', (evicted_key,)
+                )
+                self.total_bytes -= size
+                self.stats['evicted'] += 1
+                if self.total_bytes <= self.max_bytes:
+                    break
+        self._written()
+
+
+class SingleFlight:
+    """Объединяет одновременные загрузки по одному ключу в одну.
+
+    Первый вызов запускает загрузку отдельной задачей, остальные ждут
+    ее результата, поэтому отмена одного вызова не прерывает загрузку для
+    других. Сохранять готовый результат в cache должна сама загрузка:
+    она лучше знает, какие ответы можно переиспользовать.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.in_flight = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def _done(self, key, task):
+        self.in_flight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def run(self, key, load):
+        """Возвращает результат из кэша, текущей или новой загрузки."""
+        if self.cache is not None and (
+            cached := self.cache.get(key)
+        ) is not None:
+            self.stats['hits'] += 1
+            return cached
+        task = self.in_flight.get(key)
+        if task is None:
+            self.stats['misses'] += 1
+            task = asyncio.ensure_future(load())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
@@ -3,11 +3,15 @@ import csv
 import os
 
 import aiohttp
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import requests
 
 from . import logger, FILENAME_FOR_CANDIDATES, HEADERS, PROJECT_ROOT, RAW_DIR
+from .cache import HTTPCache, TTLCache
+from .company_names import normalize_company_name
+from .html_parser import DEFAULT_PARSER_BACKEND, make_soup, resolve_backend
+from .retry import RetryPolicy
+from .throttling import AdaptiveLimiter
 
 load_dotenv(PROJECT_ROOT / '.env')
 
@@ -18,13 +22,17 @@ DADATA_API_URL = (
     'https://suggestions.dadata.ru/'
     'suggestions/api/4_1/rs/suggest/party'
 )
-DADATA_SEMAPHORE = asyncio.Semaphore(10)
+DADATA_CONCURRENCY = 10
+DADATA_MAX_CONCURRENCY = 30
+DADATA_CACHE_TTL = 30 * 86400
 
 
-def parse_participants_from_forum(html_content):
+def parse_participants_from_forum(
+    html_content, parser_backend=DEFAULT_PARSER_BACKEND
+):
     """Парсит список компаний-участников форума контакт центр 2025."""
     companies = []
-    title_tag = BeautifulSoup(html_content, 'html.parser').find(
+    title_tag = make_soup(html_content, parser_backend).find(
         'h2', class_='content__parttitle',
         string=lambda t: 'Участники Форума' in t if t else False
     )
@@ -59,12 +67,14 @@ def parse_participants_from_forum(html_content):
     return companies
 
 
-def parse_speakers_from_ccwf(html_content):
+def parse_speakers_from_ccwf(
+    html_content, parser_backend=DEFAULT_PARSER_BACKEND
+):
     """Парсит список компаний-спикеров ccwf."""
     companies = []
-    for card in BeautifulSoup(
-        html_content, 'html.parser'
-    ).find_all('div', class_='t537__itemwrapper'):
+    for card in make_soup(html_content, parser_backend).find_all(
+        'div', class_='t537__itemwrapper'
+    ):
         company_div = card.find('div', class_='t537__perstext')
         if company_div:
             company_name = company_div.get_text(strip=True)
@@ -73,69 +83,109 @@ def parse_speakers_from_ccwf(html_content):
     return companies
 
 
-async def check_company_dadata(session, company_name):
-    """Асинхронная проверка компании."""
-    async with DADATA_SEMAPHORE:
-        try:
-            async with session.post(
-                DADATA_API_URL,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json',
-                    'Authorization': f'Token {DADATA_API_KEY}'
-                },
-                json={'query': company_name, 'count': 1}
-            ) as response:
-                if response.status != 200:
-                    return None
-                data = await response.json()
-                if not data.get('suggestions'):
-                    return None
-                company_data = data['suggestions'][0].get('data', {})
-                inn = str(company_data.get('inn', ''))
-                if len(inn) != 10 or not inn.isdigit():
-                    return None
-                country = company_data.get(
-                    'address', {}
-                ).get('data', {}).get('country', '')
-                if not country or country.lower() not in (
-                    'россия', 'russia', 'ru'
-                ):
-                    return None
-                return {'name': company_name, 'inn': inn}
-        except Exception as e:
-            logger.error(f'Ошибка для {company_name}: {type(e).__name__}')
-    return None
+def fetch_seed_page(url, http_cache=None):
+    """Загружает страницу с семенами, повторно проверяя копию в кэше."""
+    entry = http_cache.get(url) if http_cache else None
+    if entry and entry['fresh']:
+        return entry['body'].decode(entry['encoding'], errors='replace')
+    response = requests.get(url, headers={
+        **HEADERS,
+        'Accept': (
+            'text/html,application/xhtml+xml'
+            ',application/xml;q=0.9,*/*;q=0.8'
+        ),
+        **HTTPCache.validators(entry)
+    })
+    if response.status_code == 304 and entry:
+        http_cache.revalidated(url)
+        return entry['body'].decode(entry['encoding'], errors='replace')
+    response.raise_for_status()
+    encoding = response.encoding or response.apparent_encoding
+    if http_cache:
+        http_cache.set(
+            url, response.status_code, response.content, encoding,
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified')
+        )
+    return response.content.decode(encoding, errors='replace')
 
 
-async def process_companies_async(company_names):
-    async with aiohttp.ClientSession() as session:
-        tasks = [
-            check_company_dadata(session, name)
-            for name in company_names
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-    return [result for result in results if isinstance(result, dict)]
+def russian_company_inn(data):
+    """Возвращает ИНН первой подсказки DaData, если это российское юрлицо."""
+    if not data.get('suggestions'):
+        return ''
+    company_data = data['suggestions'][0].get('data', {})
+    inn = str(company_data.get('inn', ''))
+    if len(inn) != 10 or not inn.isdigit():
+        return ''
+    country = company_data.get('address', {}).get('data', {}).get(
+        'country', ''
+    )
+    if not country or country.lower() not in ('россия', 'russia', 'ru'):
+        return ''
+    return inn
+
+
+async def check_company_dadata(
+    session, company_name, retry_policy, limiter, lookup_cache=None
+):
+    """Асинхронная проверка компании.
+
+    Ответы DaData, в том числе отказы, сохраняются в lookup_cache по
+    нормализованному названию и переиспользуются в следующих запусках.
+    """
+    key = normalize_company_name(company_name) or company_name
+    cached = lookup_cache.get(key) if lookup_cache else None
+    if cached is not None:
+        inn = cached['inn']
+        return {'name': company_name, 'inn': inn} if inn else None
+    try:
+        async with retry_policy.request(
+            session, 'POST', DADATA_API_URL,
+            stage='dadata',
+            idempotent=True,
+            limiter=limiter,
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+                'Authorization': f'Token {DADATA_API_KEY}'
+            },
+            json={'query': company_name, 'count': 1}
+        ) as response:
+            if response.status != 200:
+                return None
+            inn = russian_company_inn(await response.json())
+        if lookup_cache:
+            lookup_cache.set(key, {'inn': inn})
+        return {'name': company_name, 'inn': inn} if inn else None
+    except Exception as e:
+        logger.error(f'Ошибка для {company_name}: {type(e).__name__}')
+    return None
 
 
-def normalize_company_name(name):
-    """Приводит название компании к стандартному виду для сравнения."""
-    if not name:
-        return ''
-    normalized = name.strip().lower()
-    forms_to_remove = [
-        'ооо ', 'зао ', 'ао ', 'пао ', 'оао ', 'ип ', 'нко ', 'мкк ',
-        'общество с ограниченной ответственностью ',
-        'акционерное общество ', 'публичное акционерное общество '
-    ]
-    for form in forms_to_remove:
-        if normalized.startswith(form):
-            normalized = normalized[len(form):]
-    normalized = normalized.replace('"', '').replace("'", "")
-    normalized = ' '.join(normalized.split())
-    if normalized.endswith(' банк'):
-        normalized = 'банк ' + normalized[:-5]
-    return normalized
+async def process_companies_async(company_names, retry_policy=None):
+    retry_policy = retry_policy or RetryPolicy()
+    limiter = AdaptiveLimiter(
+        initial=DADATA_CONCURRENCY, max_limit=DADATA_MAX_CONCURRENCY
+    )
+    lookup_cache = TTLCache(
+        'dadata_lookups.sqlite3', default_ttl=DADATA_CACHE_TTL, preload=True
+    )
+    try:
+        async with aiohttp.ClientSession() as session:
+            tasks = [
+                check_company_dadata(
+                    session, name, retry_policy, limiter, lookup_cache
+                )
+                for name in company_names
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f'Статистика повторов: {retry_policy.as_dict()}')
+        logger.info(f'Адаптивный лимит DaData: {limiter.as_dict()}')
+        logger.info(f'Кэш DaData: {lookup_cache.stats}')
+    finally:
+        lookup_cache.close()
+    return [result for result in results if isinstance(result, dict)]
 
 
 def save_to_csv(companies, filename=FILENAME_FOR_CANDIDATES):
@@ -163,25 +213,21 @@ def save_to_csv(companies, filename=FILENAME_FOR_CANDIDATES):
         return False
 
 
-async def main_async():
+async def main_async(parser_backend=DEFAULT_PARSER_BACKEND):
     if not DADATA_API_KEY:
         logger.error('Отсутствует API ключ DaData.')
         return
+    parser_backend = resolve_backend(parser_backend)
+    http_cache = HTTPCache()
     try:
         companies = []
         for site, func in (
             (FORUM_URL, parse_participants_from_forum),
             (CCWF_URL, parse_speakers_from_ccwf)
         ):
-            response = requests.get(site, headers={
-                **HEADERS,
-                'Accept': (
-                    'text/html,application/xhtml+xml'
-                    ',application/xml;q=0.9,*/*;q=0.8'
-                )
-            })
-            response.raise_for_status()
-            companies.extend(func(response.text))
+            companies.extend(func(
+                fetch_seed_page(site, http_cache), parser_backend
+            ))
         result = {}
         for company in companies:
             if norm_name := normalize_company_name(company['name']):
@@ -200,7 +246,9 @@ async def main_async():
         logger.error(f'Ошибка при загрузке страниц: {str(e)}')
     except Exception as e:
         logger.error(f'Общая ошибка: {type(e).__name__}: {str(e)}')
+    finally:
+        http_cache.close()
 
 
-def main():
-    asyncio.run(main_async())
+def main(parser_backend=DEFAULT_PARSER_BACKEND):
+    asyncio.run(main_async(parser_backend))
@@ -0,0 +1,18 @@
+def normalize_company_name(name):
+    """Приводит название компании к стандартному виду для сравнения."""
+    if not name:
+        return ''
+    normalized = name.strip().lower()
+    forms_to_remove = [
+        'ооо ', 'зао ', 'ао ', 'пао ', 'оао ', 'ип ', 'нко ', 'мкк ',
+        'общество с ограниченной ответственностью ',
+        'акционерное общество ', 'публичное акционерное общество '
+    ]
+    for form in forms_to_remove:
+        if normalized.startswith(form):
+            normalized = normalized[len(form):]
+    normalized = normalized.replace('"', '').replace("'", "")
+    normalized = ' '.join(normalized.split())
+    if normalized.endswith(' банк'):
+        normalized = 'банк ' + normalized[:-5]
+    return normalized
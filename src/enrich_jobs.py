@@ -1,5 +1,6 @@
 import asyncio
 import re
+import time
 from dataclasses import dataclass, field
 from typing import List
 
@@ -13,6 +14,33 @@ from . import (
     HEADERS,
     RAW_DIR
 )
+from .cache import SingleFlight, TTLCache
+from .company_names import normalize_company_name
+from .retry import RetryPolicy
+from .throttling import AdaptiveLimiter, AdaptiveTokenBucket
+
+VACANCIES_PER_PAGE = 100
+LEVEL_B_TEAM_SIZES = (
+    (30, 18, 'несколько разных ролей и специализаций'),
+    (20, 15, 'разные роли и каналы поддержки'),
+    (15, 12, 'минимальная структура команды'),
+    (10, 10, 'консервативная оценка по признакам ТЗ'),
+)
+
+
+def compile_lowercase(patterns):
+    """Компилирует шаблоны в одно выражение для текста в нижнем регистре.
+
+    Тексты вакансий приводятся к нижнему регистру до поиска, поэтому и
+    шаблоны приводятся к нему вместо флага re.IGNORECASE: с этим флагом
+    re не ищет кириллические литералы быстрым поиском по префиксу.
+    Шаблоны не должны содержать классов в верхнем регистре (\\S, \\W, \\D).
+    """
+    if isinstance(patterns, str):
+        patterns = (patterns,)
+    return re.compile(
+        '|'.join(f'(?:{pattern.lower()})' for pattern in patterns)
+    )
 
 
 @dataclass
@@ -91,9 +119,31 @@ class ValidCompanyResult:
 class HHSupportAnalyzer:
     """Анализатор поддержки через HeadHunter API и анализ сайтов"""
 
-    def __init__(self, max_concurrent: int = 3, request_timeout: float = 15):
+    def __init__(
+        self,
+        max_concurrent: int = 3,
+        request_timeout: float = 15,
+        retry_policy: RetryPolicy = None,
+        max_concurrent_limit: int = 16,
+        target_latency: float = 2.0,
+        requests_per_second: float = 10,
+        employer_ttl: float = 30 * 86400,
+        vacancies_ttl: float = 6 * 3600,
+        max_cached_employers: int = 50000,
+        max_cached_vacancies: int = 5000
+    ):
         self.request_timeout = request_timeout
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.employer_ttl = employer_ttl
+        self.vacancies_ttl = vacancies_ttl
+        self.max_cached_employers = max_cached_employers
+        self.max_cached_vacancies = max_cached_vacancies
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.limiter = AdaptiveLimiter(
+            initial=max_concurrent,
+            max_limit=max(max_concurrent, max_concurrent_limit),
+            target_latency=target_latency
+        )
+        self.rate_limiter = AdaptiveTokenBucket(requests_per_second)
         self.support_keywords = (
             r'поддержк[а-яё]*', r'helpdesk', r'service\s*desk',
             r'оператор', r'консультант', r'специалист\s+поддержки',
@@ -189,9 +239,67 @@ class HHSupportAnalyzer:
             'чат_поддержка': ('чат', 'письменн', 'email', 'модератор'),
             'консультант': ('консультант', 'специалист', 'агент'),
         }
-        self.employer_cache = {}
-        self.vacancies_cache = {}
-        self.website_cache = {}
+        self.direct_patterns = (
+            (
+                r'(?:в\s+)?(?:нашей\s+)?(?:команд[еа]|отдел[еа]|'
+                r'служб[ае])\s+поддержк[а-яё]*[\s\w,.-]{0,50}?'
+                r'(\d{2,})\s*(?:человек|сотрудник|специалист|оператор)'
+            ),
+            (
+                r'работа[еюю]т\s+в\s+(?:поддержк|контакт[-\s]*центр)'
+                r'[\s\w,.-]{0,50}?(\d{2,})\s*(?:человек|сотрудник)'
+            ),
+            (
+                r'размер[\s\w,.-]{0,30}?(?:команд[ыы]|отдел[аа])'
+                r'[\s\w,.-]{0,30}?(\d{2,})\s*(?:человек|сотрудник)'
+            ),
+            (
+                r'(?:более|около|свыше|до)\s+(\d{2,})\s*(?:человек|'
+                r'сотрудник)[\s\w,.-]{0,40}(?:в\s+)?поддержк'
+            ),
+            (
+                r'поддержк[а-яё]*[\s\w,.-]{0,30}?из\s+(\d{2,})\s*'
+                r'(?:человек|сотрудник)'
+            ),
+            (
+                r'контакт[-\s]*центр[\s\w,.-]{0,60}?(\d{2,})\s*'
+                r'(?:человек|сотрудник|оператор|мест|работников)'
+            ),
+            (
+                r'штат\s+(?:поддержк|контакт[-\s]*центр)[\s\w,.-]'
+                r'{0,30}?(\d{2,})\s*(?:человек|сотрудник)'
+            ),
+            (
+                r'обрабатываем\s+в\s+день[\s\w,.-]{0,30}?'
+                r'(\d{2,})\s*(?:тысяч|запросов|обращений)'
+            ),
+            (
+                r'ежедневно\s+(?:обрабатываем|принимаем)[\s\w,.-]'
+                r'{0,30}?(\d{2,})\s*(?:тысяч|звонков)'
+            ),
+        )
+        self.exclude_regexes = tuple(
+            (compile_lowercase(pattern), condition)
+            for pattern, condition in self.exclude_patterns
+        )
+        self.support_regex = compile_lowercase(self.support_keywords)
+        self.shift_regex = compile_lowercase(self.shift_patterns)
+        self.load_regex = compile_lowercase(self.load_patterns)
+        self.twentyfour_seven_regex = compile_lowercase(
+            (r'24[/×x]7', r'24\s*часа', r'круглосуточно')
+        )
+        self.l1_l2_regex = compile_lowercase(
+            r'L[123]|(?:перва|втора|третья)\s+линия|1[-\s]?я\s+линия'
+        )
+        self.chat_regex = compile_lowercase(r'чат|письменн|email|мессенджер')
+        self.phone_regex = compile_lowercase(r'звонк|телефон|call|колл')
+        self.direct_regexes = tuple(
+            compile_lowercase(pattern) for pattern in self.direct_patterns
+        )
+        self.employer_cache = None
+        self.vacancies_cache = None
+        self.employer_lookups = None
+        self.vacancy_lookups = None
 
     async def __aenter__(self):
         """Инициализация сессии."""
@@ -203,6 +311,20 @@ class HHSupportAnalyzer:
                 'Accept': 'application/json, text/html'
             }
         )
+        self.employer_cache = TTLCache(
+            'hh_employers.sqlite3',
+            default_ttl=self.employer_ttl,
+            max_entries=self.max_cached_employers,
+            preload=True
+        )
+        self.vacancies_cache = TTLCache(
+            'hh_vacancies.sqlite3',
+            default_ttl=self.vacancies_ttl,
+            max_entries=self.max_cached_vacancies,
+            preload=True
+        )
+        self.employer_lookups = SingleFlight(self.employer_cache)
+        self.vacancy_lookups = SingleFlight(self.vacancies_cache)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -210,6 +332,23 @@ class HHSupportAnalyzer:
         if self.session:
             await self.session.close()
             self.session = None
+        logger.info(f'Статистика повторов: {self.retry_policy.as_dict()}')
+        logger.info(f'Адаптивный лимит HH: {self.limiter.as_dict()}')
+        logger.info(f'Частота запросов к HH: {self.rate_limiter.as_dict()}')
+        if self.employer_cache:
+            logger.info(
+                f'Объединение запросов HH: работодатели '
+                f'{self.employer_lookups.stats}, '
+                f'вакансии {self.vacancy_lookups.stats}'
+            )
+            logger.info(
+                f'Кэш HH: работодатели {self.employer_cache.stats}, '
+                f'вакансии {self.vacancies_cache.stats}'
+            )
+            self.employer_cache.close()
+            self.vacancies_cache.close()
+            self.employer_cache = None
+            self.vacancies_cache = None
         return False
 
     def support_vacancy(self, title, snippet=''):
@@ -218,16 +357,10 @@ class HHSupportAnalyzer:
             return False, ''
         title_lower = title.lower()
         full_text = f'{title_lower} {(snippet or '').lower()}'
-        for pattern, condition in self.exclude_patterns:
-            if re.search(pattern, title_lower, re.IGNORECASE):
-                if condition(full_text):
-                    return False, 'excluded_role'
-        has_support_keyword = False
-        for pattern in self.support_keywords:
-            if re.search(pattern, title_lower, re.IGNORECASE):
-                has_support_keyword = True
-                break
-        if not has_support_keyword:
+        for regex, condition in self.exclude_regexes:
+            if regex.search(title_lower) and condition(full_text):
+                return False, 'excluded_role'
+        if not self.support_regex.search(title_lower):
             return False, 'no_support_keyword'
         if 'менеджер' in title_lower:
             if 'продаж' in title_lower and 'без продаж' not in full_text:
@@ -240,28 +373,13 @@ class HHSupportAnalyzer:
         """Анализирует качество вакансии для Уровня B."""
         text = f'{title.lower()} {snippet.lower()}'.lower()
         result = {
-            'is_shift_work': any(re.search(
-                pattern, text, re.IGNORECASE
-            ) for pattern in self.shift_patterns),
-            'has_load_mention': any(re.search(
-                pattern, text, re.IGNORECASE
-            ) for pattern in self.load_patterns),
-            'is_24_7': any(
-                re.search(pattern, text, re.IGNORECASE) for pattern in (
-                    r'24[/×x]7', r'24\s*часа', r'круглосуточно'
-                )
-            ),
+            'is_shift_work': bool(self.shift_regex.search(text)),
+            'has_load_mention': bool(self.load_regex.search(text)),
+            'is_24_7': bool(self.twentyfour_seven_regex.search(text)),
             'role_category': None,
-            'is_l1_l2': bool(re.search(
-                r'L[123]|(?:перва|втора|третья)\s+линия|1[-\s]?я\s+линия',
-                text, re.IGNORECASE
-            )),
-            'is_chat_support': bool(re.search(
-                r'чат|письменн|email|мессенджер', text, re.IGNORECASE
-            )),
-            'is_phone_support': bool(re.search(
-                r'звонк|телефон|call|колл', text, re.IGNORECASE
-            )),
+            'is_l1_l2': bool(self.l1_l2_regex.search(text)),
+            'is_chat_support': bool(self.chat_regex.search(text)),
+            'is_phone_support': bool(self.phone_regex.search(text)),
         }
         for category, keywords in self.role_categories.items():
             for keyword in keywords:
@@ -300,47 +418,8 @@ class HHSupportAnalyzer:
             full_text = (
                 f'{vac.get('title', '')} {vac.get('snippet', '')}'
             ).lower()
-            direct_patterns = (
-                (
-                    r'(?:в\s+)?(?:нашей\s+)?(?:команд[еа]|отдел[еа]|'
-                    r'служб[ае])\s+поддержк[а-яё]*[\s\w,.-]{0,50}?'
-                    r'(\d{2,})\s*(?:человек|сотрудник|специалист|оператор)'
-                ),
-                (
-                    r'работа[еюю]т\s+в\s+(?:поддержк|контакт[-\s]*центр)'
-                    r'[\s\w,.-]{0,50}?(\d{2,})\s*(?:человек|сотрудник)'
-                ),
-                (
-                    r'размер[\s\w,.-]{0,30}?(?:команд[ыы]|отдел[аа])'
-                    r'[\s\w,.-]{0,30}?(\d{2,})\s*(?:человек|сотрудник)'
-                ),
-                (
-                    r'(?:более|около|свыше|до)\s+(\d{2,})\s*(?:человек|'
-                    r'сотрудник)[\s\w,.-]{0,40}(?:в\s+)?поддержк'
-                ),
-                (
-                    r'поддержк[а-яё]*[\s\w,.-]{0,30}?из\s+(\d{2,})\s*'
-                    r'(?:человек|сотрудник)'
-                ),
-                (
-                    r'контакт[-\s]*центр[\s\w,.-]{0,60}?(\d{2,})\s*'
-                    r'(?:человек|сотрудник|оператор|мест|работников)'
-                ),
-                (
-                    r'штат\s+(?:поддержк|контакт[-\s]*центр)[\s\w,.-]'
-                    r'{0,30}?(\d{2,})\s*(?:человек|сотрудник)'
-                ),
-                (
-                    r'обрабатываем\s+в\s+день[\s\w,.-]{0,30}?'
-                    r'(\d{2,})\s*(?:тысяч|запросов|обращений)'
-                ),
-                (
-                    r'ежедневно\s+(?:обрабатываем|принимаем)[\s\w,.-]'
-                    r'{0,30}?(\d{2,})\s*(?:тысяч|звонков)'
-                ),
-            )
-            for pattern in direct_patterns:
-                match = re.search(pattern, full_text, re.IGNORECASE)
+            for regex in self.direct_regexes:
+                match = regex.search(full_text)
                 if match:
                     try:
                         size = int(match.group(1))
@@ -448,21 +527,12 @@ class HHSupportAnalyzer:
         if load_mention_count > 0:
             score += 15
             evidence_parts.append('высокая нагрузка')
-        if score >= 30:
-            team_size = 18
-            level_desc = 'несколько разных ролей и специализаций'
-        elif score >= 20:
-            team_size = 15
-            level_desc = 'разные роли и каналы поддержки'
-        elif score >= 15:
-            team_size = 12
-            level_desc = 'минимальная структура команды'
-        elif score >= 10:
-            team_size = 10
-            level_desc = 'консервативная оценка по признакам ТЗ'
-        else:
-            team_size = 0
-            level_desc = 'недостаточно доказательств для оценки ≥10'
+        team_size = 0
+        level_desc = 'недостаточно доказательств для оценки ≥10'
+        for min_score, size, description in LEVEL_B_TEAM_SIZES:
+            if score >= min_score:
+                team_size, level_desc = size, description
+                break
         if evidence_parts:
             evidence = f'Уровень B: {", ".join(evidence_parts)}'
         elif vacancy_count > 0:
@@ -493,91 +563,295 @@ class HHSupportAnalyzer:
             }
         }
 
+    def classify_vacancies_frame(self, vacancies, support_only=False):
+        """Размечает вакансии признаками поддержки и Уровня B.
+
+        Принимает DataFrame с колонками title и snippet и возвращает его
+        копию с теми же флагами, что дают support_vacancy и
+        analyze_vacancy_quality. Каждый шаблон проверяется один раз на
+        каждый различный заголовок и текст, повторы берут готовый ответ.
+        С support_only остаются только вакансии поддержки. Строки
+        сопоставляются по позиции, поэтому индекс может повторяться.
+        """
+        index = vacancies.index
+        frame = vacancies.reset_index(drop=True)
+        raw_title = frame['title'].fillna('').astype(str)
+        title = raw_title.str.lower()
+        text = title + ' ' + frame['snippet'].fillna('').astype(
+            str
+        ).str.lower()
+        title_codes, titles = pd.factorize(title)
+        text_codes, texts = pd.factorize(text)
+        titles, texts = pd.Series(titles), pd.Series(texts)
+
+        def title_contains(pattern):
+            return titles.str.contains(pattern).to_numpy()[title_codes]
+
+        def text_contains(pattern):
+            return texts.str.contains(pattern).to_numpy()[text_codes]
+
+        excluded = pd.Series(False, index=frame.index)
+        for regex, condition in self.exclude_regexes:
+            matched = title_contains(regex)
+            excluded |= text[matched].map(condition).reindex(
+                frame.index, fill_value=False
+            ).astype(bool)
+        manager = title_contains('менеджер')
+        sales_manager = manager & title_contains('продаж') & ~text_contains(
+            'без продаж'
+        )
+        non_client_manager = manager & ~text_contains(
+            'клиент'
+        ) & ~text_contains('поддерж')
+        frame['is_support'] = (
+            (raw_title.str.len() >= 3) & ~excluded
+            & title_contains(self.support_regex)
+            & ~sales_manager & ~non_client_manager
+        )
+        frame['is_excluded'] = excluded
+        if support_only:
+            frame = frame[frame['is_support']]
+            text_codes, texts = pd.factorize(text[frame.index])
+            texts = pd.Series(texts)
+        for column, regex in (
+            ('is_shift_work', self.shift_regex),
+            ('has_load_mention', self.load_regex),
+            ('is_24_7', self.twentyfour_seven_regex),
+            ('is_l1_l2', self.l1_l2_regex),
+            ('is_chat_support', self.chat_regex),
+            ('is_phone_support', self.phone_regex),
+        ):
+            frame[column] = text_contains(regex)
+        role_category = pd.Series(None, index=frame.index, dtype=object)
+        for category, keywords in reversed(self.role_categories.items()):
+            role_category = role_category.mask(text_contains(
+                '|'.join(map(re.escape, keywords))
+            ), category)
+        frame['role_category'] = role_category
+        frame.index = index[frame.index]
+        return frame
+
+    def score_employers_frame(
+        self, vacancies, employer_column='employer_id'
+    ):
+        """Считает оценку Уровня B по вакансиям каждого работодателя.
+
+        Учитывает только вакансии поддержки и повторяет подсчет баллов
+        analyze_vacancies_set без поиска прямых упоминаний Уровня A.
+        """
+        employers = vacancies[employer_column].drop_duplicates()
+        support = self.classify_vacancies_frame(vacancies, support_only=True)
+        scores = support.groupby(employer_column).agg(
+            vacancy_count=('is_support', 'size'),
+            unique_roles=('role_category', 'nunique'),
+            shift_work_count=('is_shift_work', 'sum'),
+            load_mention_count=('has_load_mention', 'sum'),
+            twentyfour_seven_count=('is_24_7', 'sum'),
+            l1_l2_count=('is_l1_l2', 'sum'),
+            has_chat=('is_chat_support', 'any'),
+            has_phone=('is_phone_support', 'any'),
+        ).reindex(employers, fill_value=0)
+        count = scores['vacancy_count']
+        has_chat = scores['has_chat'].astype(bool)
+        has_phone = scores['has_phone'].astype(bool)
+        twentyfour_seven = scores['twentyfour_seven_count'] > 0
+        shift_work = scores['shift_work_count'] > 0
+        scores['score'] = (
+            count.clip(upper=3).map({0: 0, 1: 5, 2: 10, 3: 20})
+            + 15 * (scores['unique_roles'] >= 2)
+            + 20 * twentyfour_seven + 15 * (shift_work & ~twentyfour_seven)
+            + 10 * (scores['l1_l2_count'] > 0)
+            + 10 * (has_chat & has_phone) + 5 * (has_chat ^ has_phone)
+            + 15 * (scores['load_mention_count'] > 0)
+        )
+        team_size = pd.Series(0, index=scores.index)
+        for min_score, size, _ in reversed(LEVEL_B_TEAM_SIZES):
+            team_size = team_size.mask(scores['score'] >= min_score, size)
+        scores['team_size'] = team_size
+        scores['shift_work'] = shift_work | twentyfour_seven
+        scores['mentions_24_7'] = twentyfour_seven
+        scores['has_chat_phone_both'] = has_chat & has_phone
+        return scores.drop(columns=['has_chat', 'has_phone'])
+
     async def find_employer_id(self, company_name):
-        """Находит ID работодателя на HH."""
-        cache_key = company_name.lower().strip()
-        if cache_key in self.employer_cache:
-            return self.employer_cache[cache_key]
-        async with self.semaphore:
-            try:
-                async with self.session.get(
-                    'https://api.hh.ru/employers',
-                    params={
-                        'text': f'{company_name}',
-                        'area': '113',
-                        'per_page': '20',
-                        'only_with_vacancies': 'true'
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        items = data.get('items', [])
-                        if items:
-                            best_match = None
-                            best_score = 0
-                            search_name = company_name.lower()
-                            search_words = set(search_name.split())
-                            for item in items:
-                                item_name = item.get('name', '').lower()
-                                item_words = set(item_name.split())
-                                score = 0
-                                if search_name == item_name:
-                                    score += 100
-                                elif search_name in item_name:
-                                    score += 80
-                                elif any(
-                                    word in item_name for word in search_words
-                                ):
-                                    common_words = search_words.intersection(
-                                        item_words
-                                    )
-                                    score += len(common_words) * 20
-                                open_vacancies = item.get('open_vacancies', 0)
-                                score += min(open_vacancies, 10) * 2
-                                if item.get('type') == 'company':
-                                    score += 10
-                                if score > best_score:
-                                    best_score = score
-                                    best_match = item
-                            if best_match and best_score >= 40:
-                                employer_url = best_match.get(
-                                    'alternate_url', ''
-                                )
-                                employer_id = employer_url.split(
-                                    '/'
-                                )[-1] if employer_url else best_match['id']
-                                result = (
-                                    employer_id,
-                                    best_match['name'],
-                                    employer_url
+        """Находит ID работодателя на HH.
+
+        Одновременные поиски одинаковых после нормализации названий
+        выполняются одним запросом.
+        """
+        cache_key = normalize_company_name(
+            company_name
+        ) or company_name.lower().strip()
+        return tuple(await self.employer_lookups.run(
+            cache_key,
+            lambda: self._find_employer_id(company_name, cache_key)
+        ))
+
+    async def _find_employer_id(self, company_name, cache_key):
+        try:
+            async with self.retry_policy.request(
+                self.session, 'GET', 'https://api.hh.ru/employers',
+                stage='hh_employers',
+                limiter=self.limiter,
+                rate_limiter=self.rate_limiter,
+                params={
+                    'text': f'{company_name}',
+                    'area': '113',
+                    'per_page': '20',
+                    'only_with_vacancies': 'true'
+                }
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    items = data.get('items', [])
+                    if items:
+                        best_match = None
+                        best_score = 0
+                        search_name = company_name.lower()
+                        search_words = set(search_name.split())
+                        for item in items:
+                            item_name = item.get('name', '').lower()
+                            item_words = set(item_name.split())
+                            score = 0
+                            if search_name == item_name:
+                                score += 100
+                            elif search_name in item_name:
+                                score += 80
+                            elif any(
+                                word in item_name for word in search_words
+                            ):
+                                common_words = search_words.intersection(
+                                    item_words
                                 )
-                                self.employer_cache[cache_key] = result
-                                return result
-                async with self.session.get(
-                    'https://api.hh.ru/employers',
-                    params={
-                        'text': company_name,
-                        'area': '113',
-                        'per_page': '10'
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        items = data.get('items', [])
-                        if items:
-                            employer_url = items[0].get('alternate_url', '')
+                                score += len(common_words) * 20
+                            open_vacancies = item.get('open_vacancies', 0)
+                            score += min(open_vacancies, 10) * 2
+                            if item.get('type') == 'company':
+                                score += 10
+                            if score > best_score:
+                                best_score = score
+                                best_match = item
+                        if best_match and best_score >= 40:
+                            employer_url = best_match.get(
+                                'alternate_url', ''
+                            )
                             employer_id = employer_url.split(
                                 '/'
-                            )[-1] if employer_url else items[0]['id']
+                            )[-1] if employer_url else best_match['id']
                             result = (
-                                employer_id, items[0]['name'], employer_url
+                                employer_id,
+                                best_match['name'],
+                                employer_url
                             )
-                            self.employer_cache[cache_key] = result
+                            self.employer_cache.set(cache_key, result)
                             return result
-                return ('', '', '')
+            async with self.retry_policy.request(
+                self.session, 'GET', 'https://api.hh.ru/employers',
+                stage='hh_employers',
+                limiter=self.limiter,
+                rate_limiter=self.rate_limiter,
+                params={
+                    'text': company_name,
+                    'area': '113',
+                    'per_page': '10'
+                }
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    items = data.get('items', [])
+                    if items:
+                        employer_url = items[0].get('alternate_url', '')
+                        employer_id = employer_url.split(
+                            '/'
+                        )[-1] if employer_url else items[0]['id']
+                        result = (
+                            employer_id, items[0]['name'], employer_url
+                        )
+                        self.employer_cache.set(cache_key, result)
+                        return result
+            return ('', '', '')
+        except Exception as e:
+            logger.error(f'Ошибка: {e}')
+            return ('', '', '')
+
+    def select_support_vacancies(self, items):
+        """Отбирает вакансии поддержки из страницы выдачи HH."""
+        found = []
+        for item in items:
+            title = item.get('name', '')
+            snippet = item.get('snippet') or {}
+            snippet = (
+                f"{snippet.get('requirement') or ''} "
+                f"{snippet.get('responsibility') or ''}"
+            )
+            is_support, reason = self.support_vacancy(title, snippet)
+            if is_support:
+                found.append({
+                    'title': title,
+                    'snippet': snippet,
+                    'url': item.get(
+                        'alternate_url',
+                        f'https://hh.ru/vacancy/{item['id']}'
+                    ),
+                    'id': item['id'],
+                    'reason': reason
+                })
+        return found
+
+    async def fetch_employer_vacancies_page(self, employer_id, page):
+        """Загружает одну страницу вакансий работодателя."""
+        async with self.retry_policy.request(
+            self.session, 'GET', 'https://api.hh.ru/vacancies',
+            stage='hh_vacancies',
+            limiter=self.limiter,
+            rate_limiter=self.rate_limiter,
+            params={
+                'employer_id': employer_id,
+                'area': '113',
+                'per_page': str(VACANCIES_PER_PAGE),
+                'page': str(page)
+            }
+        ) as response:
+            if response.status != 200:
+                return None
+            return await response.json()
+
+    async def search_employer_vacancies(self, employer_id):
+        """Собирает вакансии поддержки со всех страниц работодателя.
+
+        Первая страница сообщает число страниц, остальные запрашиваются
+        одновременно в пределах лимитов HH и разбираются по мере прихода.
+        Итог собирается в порядке страниц, как при последовательном обходе.
+        Возвращает вакансии и признак того, что все страницы загружены.
+        """
+        first_page = await self.fetch_employer_vacancies_page(employer_id, 0)
+        if first_page is None:
+            return [], False
+        if not first_page.get('items'):
+            return [], True
+        found = {0: self.select_support_vacancies(first_page['items'])}
+        complete = True
+
+        async def fetch_page(page):
+            try:
+                return page, await self.fetch_employer_vacancies_page(
+                    employer_id, page
+                )
             except Exception as e:
-                logger.error(f'Ошибка: {e}')
-                return ('', '', '')
+                logger.error(f'Ошибка страницы {page} для {employer_id}: {e}')
+                return page, None
+
+        for next_page in asyncio.as_completed([
+            fetch_page(page) for page in range(1, first_page.get('pages', 0))
+        ]):
+            page, data = await next_page
+            if data is None:
+                complete = False
+            elif data.get('items'):
+                found[page] = self.select_support_vacancies(data['items'])
+        return [
+            vacancy for page in sorted(found) for vacancy in found[page]
+        ], complete
 
     async def search_support_vacancies(
         self,
@@ -586,145 +860,112 @@ class HHSupportAnalyzer:
         employer_url=''
     ):
         """Ищет вакансии поддержки для компании с улучшенным анализом"""
-        cache_key = f'{company_name}_{employer_id}'
-        if cache_key in self.vacancies_cache:
-            return self.vacancies_cache[cache_key]
+        name_key = normalize_company_name(company_name) or company_name
+        cache_key = f'{name_key}_{employer_id}'
+        return tuple(await self.vacancy_lookups.run(
+            cache_key,
+            lambda: self._search_support_vacancies(
+                company_name, employer_id, employer_url, cache_key
+            )
+        ))
+
+    async def _search_support_vacancies(
+        self, company_name, employer_id, employer_url, cache_key
+    ):
         vacancies_data = []
         all_vacancy_urls = []
         search_url = ''
+        complete = True
         try:
-            async with self.semaphore:
-                if employer_id:
-                    page = 0
-                    per_page = 100
-                    while True:
-                        async with self.session.get(
-                            'https://api.hh.ru/vacancies',
-                            params={
-                                'employer_id': employer_id,
-                                'area': '113',
-                                'per_page': str(per_page),
-                                'page': str(page)
-                            }
-                        ) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                items = data.get('items', [])
-                                if not items:
-                                    break
-                                for item in items:
-                                    title = item.get('name', '')
-                                    snippet = item.get(
-                                        'snippet', {}
-                                    ).get('requirement', '') + ' ' + item.get(
-                                        'snippet', {}
-                                    ).get('responsibility', '')
-                                    is_support, reason = self.support_vacancy(
-                                        title, snippet
+            if employer_id:
+                found, complete = await self.search_employer_vacancies(
+                    employer_id
+                )
+                vacancies_data.extend(found)
+                all_vacancy_urls.extend(v['url'] for v in vacancies_data)
+                search_url = employer_url or (
+                    f'https://hh.ru/employer/{employer_id}'
+                )
+            if len(vacancies_data) < 5:
+                search_queries = (
+                    f'{company_name} поддержка',
+                    f'{company_name} оператор',
+                    f'{company_name} контакт-центр',
+                    f'{company_name} менеджер клиентов',
+                )
+                for query in search_queries[:2]:
+                    async with self.retry_policy.request(
+                        self.session, 'GET', 'https://api.hh.ru/vacancies',
+                        stage='hh_vacancies',
+                        limiter=self.limiter,
+                        rate_limiter=self.rate_limiter,
+                        params={
+                            'text': query,
+                            'area': '113',
+                            'per_page': '30',
+                            'page': '0',
+                            'search_field': 'company_name'
+                        }
+                    ) as response:
+                        if response.status == 200:
+                            data = await response.json()
+                            for item in data.get('items', []):
+                                title = item.get('name', '')
+                                snippet = item.get('snippet', {}).get(
+                                    'requirement', ''
+                                ) + ' ' + item.get('snippet', {}).get(
+                                    'responsibility', ''
+                                )
+                                employer_name = item.get(
+                                    'employer', {}
+                                ).get('name', '').lower()
+                                if company_name.lower() in employer_name:
+                                    is_support, reason = (
+                                        self.support_vacancy(
+                                            title, snippet
+                                        )
                                     )
                                     if is_support:
-                                        vacancies_data.append({
-                                            'title': title,
-                                            'snippet': snippet,
-                                            'url': item.get(
-                                                'alternate_url',
-                                                (
-                                                    'https://hh.ru/vacancy/'
-                                                    f'{item['id']}'
-                                                )
-                                            ),
-                                            'id': item['id'],
-                                            'reason': reason
-                                        })
-                                        all_vacancy_urls.append(item.get(
-                                            'alternate_url',
-                                            (
-                                                'https://hh.ru/vacancy/'
-                                                f'{item['id']}'
-                                            )
-                                        ))
-                                pages = data.get('pages', 0)
-                                page += 1
-                                if page >= pages:
-                                    break
-                                await asyncio.sleep(0.1)
-                        search_url = employer_url or (
-                            f'https://hh.ru/employer/{employer_id}'
-                        )
-                if len(vacancies_data) < 5:
-                    search_queries = (
-                        f'{company_name} поддержка',
-                        f'{company_name} оператор',
-                        f'{company_name} контакт-центр',
-                        f'{company_name} менеджер клиентов',
-                    )
-                    for query in search_queries[:2]:
-                        async with self.session.get(
-                            'https://api.hh.ru/vacancies',
-                            params={
-                                'text': query,
-                                'area': '113',
-                                'per_page': '30',
-                                'page': '0',
-                                'search_field': 'company_name'
-                            }
-                        ) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                for item in data.get('items', []):
-                                    title = item.get('name', '')
-                                    snippet = item.get('snippet', {}).get(
-                                        'requirement', ''
-                                    ) + ' ' + item.get('snippet', {}).get(
-                                        'responsibility', ''
-                                    )
-                                    employer_name = item.get(
-                                        'employer', {}
-                                    ).get('name', '').lower()
-                                    if company_name.lower() in employer_name:
-                                        is_support, reason = (
-                                            self.support_vacancy(
-                                                title, snippet
-                                            )
-                                        )
-                                        if is_support:
-                                            vac_id = item['id']
-                                            if not any(
-                                                v['id'] == vac_id
-                                                for v in vacancies_data
-                                            ):
-                                                vacancies_data.append({
-                                                    'title': title,
-                                                    'snippet': snippet,
-                                                    'url': item.get(
-                                                        'alternate_url',
-                                                        (
-                                                            'https://hh.ru/vac'
-                                                            f'ancy/{vac_id}'
-                                                        )
-                                                    ),
-                                                    'id': vac_id,
-                                                    'reason': reason
-                                                })
-                                                all_vacancy_urls.append(
-                                                    item.get(
-                                                        'alternate_url',
-                                                        (
-                                                            'https://hh.ru/vac'
-                                                            f'ancy/{vac_id}'
-                                                        )
+                                        vac_id = item['id']
+                                        if not any(
+                                            v['id'] == vac_id
+                                            for v in vacancies_data
+                                        ):
+                                            vacancies_data.append({
+                                                'title': title,
+                                                'snippet': snippet,
+                                                'url': item.get(
+                                                    'alternate_url',
+                                                    (
+                                                        'https://hh.ru/vac'
+                                                        f'ancy/{vac_id}'
+                                                    )
+                                                ),
+                                                'id': vac_id,
+                                                'reason': reason
+                                            })
+                                            all_vacancy_urls.append(
+                                                item.get(
+                                                    'alternate_url',
+                                                    (
+                                                        'https://hh.ru/vac'
+                                                        f'ancy/{vac_id}'
                                                     )
                                                 )
-                                if search_url == '':
-                                    search_url = (
-                                        'https://hh.ru/search/vacancy?'
-                                        f'text={query.replace(" ", "+")}'
-                                    )
-                                await asyncio.sleep(0.2)
+                                            )
+                            if search_url == '':
+                                search_url = (
+                                    'https://hh.ru/search/vacancy?'
+                                    f'text={query.replace(" ", "+")}'
+                                )
+                        else:
+                            complete = False
         except Exception as e:
             logger.error(f'Ошибка: {e}')
+            complete = False
         result = (vacancies_data, search_url)
-        self.vacancies_cache[cache_key] = result
+        if complete:
+            self.vacancies_cache.set(cache_key, result)
         return result
 
     async def analyze_company(self, name, inn, site):
@@ -823,59 +1064,88 @@ def load_companies_from_csv(filepath=RAW_DIR/FILENAME_FOR_CANDIDATES):
         return []
 
 
-async def analyze_companies_batch(
+async def iter_company_analyses(
         companies,
-        analyzer=HHSupportAnalyzer,
-        batch_size=10,
-        delay=1.0
+        analyzer,
+        workers=10,
+        report_interval=10.0
 ):
-    """Анализирует партию компаний с улучшенным управлением."""
-    valid_results = []
-    error_results = []
-    total = len(companies)
-    for batch_start in range(0, total, batch_size):
-        batch_end = min(batch_start + batch_size, total)
-        batch = companies[batch_start:batch_end]
-        batch_tasks = []
-        for company in batch:
-            task = asyncio.create_task(
-                analyzer.analyze_company(
+    """Анализирует компании пулом воркеров и отдает результаты по готовности.
+
+    Воркеры берут компании из общей очереди, поэтому в работе всегда до
+    workers анализов и медленная компания не простаивает свободные слоты.
+    Каждый результат приходит парой (индекс компании, результат или
+    исключение). Глубина очереди и пропускная способность пишутся в лог.
+    """
+    queue = asyncio.Queue()
+    for item in enumerate(companies):
+        queue.put_nowait(item)
+    results = asyncio.Queue()
+
+    async def worker():
+        while not queue.empty():
+            index, company = queue.get_nowait()
+            try:
+                result = await analyzer.analyze_company(
                     name=company['name'],
                     inn=company['inn'],
                     site=company['site']
                 )
-            )
-            batch_tasks.append(task)
-            await asyncio.sleep(0.1)
-        batch_results = await asyncio.gather(
-            *batch_tasks, return_exceptions=True
-        )
-        for result in batch_results:
-            if isinstance(result, Exception):
-                continue
-            if result is None:
-                continue
-            if (
-                result.parsed_successfully
-                and result.support_team_size_min >= 10
-            ):
-                valid_results.append(result)
-            elif not result.parsed_successfully:
-                error_results.append(result)
-        if batch_end < total:
-            await asyncio.sleep(delay)
-    return valid_results
-
-
-async def main():
+            except Exception as e:
+                result = e
+            results.put_nowait((index, result))
+
+    total = len(companies)
+    pool = [
+        asyncio.create_task(worker()) for _ in range(min(workers, total))
+    ]
+    started = reported = time.monotonic()
+    try:
+        for done in range(1, total + 1):
+            yield await results.get()
+            now = time.monotonic()
+            if done == total or now - reported >= report_interval:
+                reported = now
+                logger.info(
+                    f'HH: готово {done}/{total}, в очереди {queue.qsize()}, '
+                    f'в работе {total - done - queue.qsize()}, '
+                    f'{done / max(now - started, 1e-6):.2f} компаний/с'
+                )
+    finally:
+        for task in pool:
+            task.cancel()
+        await asyncio.gather(*pool, return_exceptions=True)
+
+
+async def analyze_companies_batch(
+        companies,
+        analyzer=HHSupportAnalyzer,
+        workers=10
+):
+    """Анализирует компании пулом воркеров, сохраняя порядок входа."""
+    results = {}
+    async for index, result in iter_company_analyses(
+        companies, analyzer, workers
+    ):
+        if isinstance(result, Exception) or result is None:
+            continue
+        if result.parsed_successfully and result.support_team_size_min >= 10:
+            results[index] = result
+    return [results[index] for index in sorted(results)]
+
+
+async def main(retry_policy=None):
     """Основная функция запуска."""
     try:
-        companies = await load_companies_from_csv()
+        companies = load_companies_from_csv()
         async with HHSupportAnalyzer(
             max_concurrent=4,
-            request_timeout=25
-        ):
-            valid_results = await analyze_companies_batch(companies)
+            request_timeout=25,
+            retry_policy=retry_policy
+        ) as analyzer:
+            valid_results = await analyze_companies_batch(
+                companies, analyzer
+            )
         if valid_results:
             df = pd.DataFrame([r.to_dict() for r in valid_results])
             df = df[df['support_team_size_min'] >= 10]
@@ -1,18 +1,47 @@
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import re
-from urllib.parse import urljoin
+import time
+from urllib.parse import urljoin, urlsplit
 
-import aiohttp
-from bs4 import BeautifulSoup
 import pandas as pd
 
 from . import (
     logger,
     FILENAME_FOR_CANDIDATES,
     FILENAME_FOR_PARSE_SITES,
-    HEADERS,
     RAW_DIR
 )
+from .anchored_pattern import AnchoredPattern
+from .cache import CACHEABLE_STATUSES, HTTPCache, TTLCache
+from .html_parser import DEFAULT_PARSER_BACKEND, parse_page, resolve_backend
+from .http_client import (
+    CharsetDetector,
+    ConnectionStats,
+    create_session,
+    HTML_ACCEPT,
+    is_html_content_type,
+    MAX_PAGE_BYTES,
+    read_limited
+)
+from .keyword_matcher import KeywordMatcher
+from .retry import RetryPolicy
+from .site_discovery import (
+    classify_urls,
+    is_same_site,
+    MAX_SITEMAP_BYTES,
+    parse_robots_sitemaps,
+    parse_sitemap,
+    sort_child_sitemaps,
+    url_key
+)
+from .throttling import (
+    AdaptiveLimiter,
+    HostCircuitBreaker,
+    RequestScheduler,
+    SITE_OVERLOAD_STATUSES
+)
 
 SUPPORT_KEYWORDS = (
     'поддерж', 'помощь', 'контакт', 'служб', 'сервис', 'техподдерж',
@@ -87,6 +116,53 @@ JOB_KEYWORDS = (
     '/vacancies', '/careers', '/employment', '/work',
     'вакансии/', 'работа/', 'карьера/'
 )
+SUPPORT_PATH_KEYWORDS = (
+    'support', 'podderzhka', 'поддержка', 'техподдержка', 'techsupport',
+    'tech support', 'customer support', 'client support', 'helpdesk',
+    'help desk', 'service desk', 'servicedesk', 'customer service',
+    'customer care', 'help', 'pomosch', 'pomoshh', 'помощь'
+)
+FAQ_PATH_KEYWORDS = (
+    'faq', 'chavo', 'чаво', 'knowledge base', 'knowledgebase',
+    'baza znanij', 'baza znaniy', 'база знаний', 'voprosy otvety',
+    'вопросы и ответы', 'вопросы ответы', 'вопрос ответ', 'questions'
+)
+JOB_PATH_KEYWORDS = (
+    'vacancies', 'vacancy', 'vakansii', 'vakansiya', 'вакансии',
+    'вакансия', 'careers', 'career', 'karera', 'kariera', 'карьера',
+    'jobs', 'job', 'rabota', 'работа', 'hiring', 'join us'
+)
+CAREER_PATTERNS = (
+    '/career', '/jobs', '/vacancies', '/vacancy', '/rabota',
+    '/about/career', '/company/career', '/company/jobs',
+    '/hr', '/work', '/team', '/careers',
+    '/вакансии', '/карьера', '/работа'
+)
+SUPPORT_HREF_KEYWORDS = ('support', 'help', 'contact', 'faq')
+VACANCY_BLOCK_KEYWORDS = ('vacancy', 'job', 'position', 'vacans', 'rabota')
+VACANCY_HREF_KEYWORDS = ('ваканс', 'vacancy', 'job', 'работа', 'career')
+CRAWL_LINK_KEYWORDS = (
+    'about', 'contact', 'company', 'o-kompanii', 'o_kompanii', 'kontakt',
+    'о компании', 'о нас', 'контакт'
+)
+DEFINITIVE_DISCOVERY_STATUSES = (200, 404)
+ROUND_THE_CLOCK_MARKERS = ('24/7', 'круглосуточно')
+LOAD_INDICATORS = (
+    'тысяч обращений', 'сотен обращений', 'высокая нагрузка',
+    'много клиентов', 'большой поток', 'крупный контакт-центр',
+    'обслуживаем тысячи', 'обрабатываем сотни'
+)
+SUPPORT_MATCHER = KeywordMatcher(SUPPORT_KEYWORDS)
+SUPPORT_HREF_MATCHER = KeywordMatcher(SUPPORT_HREF_KEYWORDS)
+LINK_MATCHER = KeywordMatcher(SUPPORT_KEYWORDS + FAQ_KEYWORDS + JOB_KEYWORDS)
+PAGE_MATCHER = KeywordMatcher(
+    CHAT_INDICATORS + MESSENGERS + ROUND_THE_CLOCK_MARKERS
+)
+LOAD_MATCHER = KeywordMatcher(LOAD_INDICATORS)
+CRAWL_LINK_MATCHER = KeywordMatcher(CRAWL_LINK_KEYWORDS)
+EMAIL_PATTERN = re.compile(
+    r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
+)
 SUPPORT_JOB_PATTERNS = (
     r'поддержк[а-яё]*', r'helpdesk', r'service\s*desk',
     r'тех[.-]*поддержк[а-яё]*', r'саппорт', r'инженер.*поддержк',
@@ -103,6 +179,118 @@ SUPPORT_JOB_PATTERNS = (
     r'technical\s+support', r'it\s+support', r'client\s+support',
     r'user\s+support', r'customer\s+care', r'customer\s+service'
 )
+VACANCY_EXCLUDE_PATTERNS = (
+    r'©', r'copyright', r'все права', r'политика',
+    r'конфиденциальност', r'карта сайта', r'cookie',
+    r'использование файлов', r'пример', r'образец',
+    r'продукт', r'услуг', r'решен', r'тариф', r'цена',
+    r'контакт', r'о компани', r'отзыв', r'новост', r'блог',
+    r'документ', r'инструкц', r'faq', r'база знаний',
+    r'компенсац', r'льгот', r'преимуществ', r'бонус',
+    r'забота', r'поддержк.*сем', r'материальн.*поддержк',
+    r'шаблон', r'тестов', r'демо', r'социальн.*поддержк'
+)
+SUPPORT_JOB_REGEX = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in SUPPORT_JOB_PATTERNS)
+)
+VACANCY_EXCLUDE_REGEX = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in VACANCY_EXCLUDE_PATTERNS)
+)
+TEAM_SIZE_PATTERNS = (
+    AnchoredPattern(
+        r'(?:в\s+)?(?:служб[еа]|команд[еа]|отдел[еа]|штат[е]?\s+)?поддерж'
+        r'(?:ки|ке|ка|ку)[\s\w,.-]{0,30}?(\d{2,})\s*'
+        r'(?:человек|сотрудник|специалист|оператор)',
+        'поддерж', before=8, after=42
+    ),
+    AnchoredPattern(
+        r'контакт[-\s]*центр[а-я]*[\s\w,.-]{0,30}?(\d{2,})\s*'
+        r'(?:человек|сотрудник|оператор|работник)',
+        'контакт', after=39, anchor_pattern=r'контакт[-\s]*центр[а-я]*'
+    ),
+    AnchoredPattern(
+        r'(?:насчитывает|составляет|всего|более|около)\s+(\d{2,})\s*'
+        r'(?:человек|сотрудник)[\s\w,.-]{0,20}(?:в\s+)?поддерж',
+        'поддерж', before=41
+    ),
+    AnchoredPattern(
+        r'поддерж(?:ка|ки|ке)[\s\w,.-]{0,30}?из\s+'
+        r'(\d{2,})\s*(?:человек|сотрудник)',
+        'поддерж', after=43
+    ),
+    AnchoredPattern(
+        r'(\d{2,})\s*(?:человек|сотрудник)'
+        r'[\s\w,.-]{0,15}работает?\s+в\s+поддерж',
+        'поддерж', before=33
+    ),
+)
+SHIFT_PATTERN = re.compile(
+    r'24[/×]7|круглосуточно|сменн[а-яё]*\s+график|'
+    r'2/2|3/3|ночн[а-яё]*\s+смен[ау]?|посменн[а-яё]*|'
+    r'сменн[а-яё]+\s+работ',
+    re.IGNORECASE
+)
+
+
+def extract_page_features(page, url):
+    """Извлекает признаки поддержки из разобранной страницы."""
+    page_hits = PAGE_MATCHER.found(
+        f'{page.visible_text} {page.markup_text}'.lower()
+    )
+    chat_vendor = next(
+        (vendor for vendor in CHAT_INDICATORS if vendor in page_hits), ''
+    )
+    features = {
+        'page_text': page.visible_text[:5000],
+        'has_support_email': False,
+        'support_email': '',
+        'has_contact_form': page.has_form,
+        'has_online_chat': bool(chat_vendor),
+        'chat_vendor': chat_vendor,
+        'has_messengers': any(
+            messenger in page_hits for messenger in MESSENGERS
+        ),
+        'has_support_section': False,
+        'support_url': '',
+        'has_kb_or_faq': False,
+        'kb_url': '',
+        'career_link': '',
+        'crawl_links': [],
+        'mentions_24_7': any(
+            marker in page_hits for marker in ROUND_THE_CLOCK_MARKERS
+        )
+    }
+    all_emails = EMAIL_PATTERN.findall(page.visible_text) + [
+        href[7:] for _, href in page.links if href.startswith('mailto:')
+    ]
+    if all_emails:
+        features['has_support_email'] = True
+        features['support_email'] = next((
+            email for email in all_emails
+            if email.lower().startswith(('support@', 'help@'))
+        ), all_emails[0])
+    for index, (text, href) in enumerate(page.links[:100]):
+        link_hits = LINK_MATCHER.found(text.lower())
+        if not features['support_url'] and (
+            not link_hits.isdisjoint(SUPPORT_KEYWORDS)
+            or SUPPORT_HREF_MATCHER.search(href.lower())
+        ):
+            features['has_support_section'] = True
+            features['support_url'] = urljoin(url, href)
+        if len(features['crawl_links']) < 10 and (
+            CRAWL_LINK_MATCHER.search(f'{text} {href}'.lower())
+        ):
+            features['crawl_links'].append(urljoin(url, href))
+        if index >= 50:
+            continue
+        if not features['kb_url'] and not link_hits.isdisjoint(FAQ_KEYWORDS):
+            features['has_kb_or_faq'] = True
+            features['kb_url'] = urljoin(url, href)
+        if not features['career_link'] and not link_hits.isdisjoint(
+            JOB_KEYWORDS
+        ):
+            features['career_link'] = urljoin(url, href)
+    return features
 
 
 def extract_support_email(text):
@@ -121,33 +309,11 @@ def extract_support_email(text):
 
 def find_size_team_mention(text, page_url):
     """Ищет упоминания размера команды поддержки."""
-    patterns = (
-        (
-            r'(?:в\s+)?(?:служб[еа]|команд[еа]|отдел[еа]|штат[е]?\s+)?поддерж'
-            r'(?:ки|ке|ка|ку)[\s\w,.-]{0,30}?(\d{2,})\s*'
-            r'(?:человек|сотрудник|специалист|оператор)'
-        ),
-        (
-            r'контакт[-\s]*центр[а-я]*[\s\w,.-]{0,30}?(\d{2,})\s*'
-            r'(?:человек|сотрудник|оператор|работник)'
-        ),
-        (
-            r'(?:насчитывает|составляет|всего|более|около)\s+(\d{2,})\s*'
-            r'(?:человек|сотрудник)[\s\w,.-]{0,20}(?:в\s+)?поддерж'
-        ),
-        (
-            r'поддерж(?:ка|ки|ке)[\s\w,.-]{0,30}?из\s+'
-            r'(\d{2,})\s*(?:человек|сотрудник)'
-        ),
-        (
-            r'(\d{2,})\s*(?:человек|сотрудник)'
-            r'[\s\w,.-]{0,15}работает?\s+в\s+поддерж'
-        ),
-    )
-    if not any(word in text.lower() for word in SUPPORT_KEYWORDS):
+    text_lower = text.lower()
+    if not SUPPORT_MATCHER.search(text_lower):
         return 0, '', ''
-    for pattern in patterns:
-        match = re.search(pattern, text.lower())
+    for pattern in TEAM_SIZE_PATTERNS:
+        match = pattern.search(text_lower)
         if match:
             try:
                 size = int(match.group(1))
@@ -155,9 +321,7 @@ def find_size_team_mention(text, page_url):
                     context = text[max(0, match.start() - 100):min(
                             len(text), match.end() + 100
                     )]
-                    if any(
-                        word in context.lower() for word in SUPPORT_KEYWORDS
-                    ):
+                    if SUPPORT_MATCHER.search(context.lower()):
                         clean_context = ' '.join(context.replace(
                             '\n', ' '
                         ).split()[:30]) + '...'
@@ -213,17 +377,8 @@ def estimate_size_team_level_b(page_data, result):
         if len(found_roles) >= 2:
             evidence.append(f'разные роли ({", ".join(found_roles)})')
             team_size = max(team_size, 10)
-    indicators = (
-        'тысяч обращений', 'сотен обращений', 'высокая нагрузка',
-        'много клиентов', 'большой поток', 'крупный контакт-центр',
-        'обслуживаем тысячи', 'обрабатываем сотни'
-    )
-    if found_load := [
-        indicator for indicator in indicators if indicator in page_data.get(
-            'full_text', ''
-        ).lower()
-    ]:
-        evidence.append(f'признаки высокой нагрузки ({found_load[0]})')
+    if found_load := page_data.get('load_indicator'):
+        evidence.append(f'признаки высокой нагрузки ({found_load})')
         team_size = max(team_size if 'team_size' in locals() else 0, 10)
     if 'team_size' not in locals() or team_size < 10 or not evidence:
         return 0, '', ''
@@ -234,6 +389,73 @@ def estimate_size_team_level_b(page_data, result):
     )
 
 
+def clean_and_filter_vacancies(job_titles):
+    """Очищает и фильтрует список вакансий, оставляя только реальные."""
+    real_vacancies = set()
+    for title in job_titles:
+        if not title or len(title) < 5:
+            continue
+        title_lower = title.lower()
+        if VACANCY_EXCLUDE_REGEX.search(
+            title_lower
+        ) or not SUPPORT_JOB_REGEX.search(title_lower):
+            continue
+        real_vacancies.add(' '.join(title.split()[:8]))
+    return list(real_vacancies)
+
+
+def decode_html(content, encoding):
+    """Декодирует тело страницы."""
+    return content.decode(encoding or 'utf-8', errors='replace')
+
+
+def analyze_homepage(content, encoding, url, parser_backend):
+    """Извлекает признаки и упоминания команды из главной страницы."""
+    html = decode_html(content, encoding)
+    if len(html) <= 100:
+        return None
+    features = extract_page_features(parse_page(html, parser_backend), url)
+    features['team_mention'] = find_size_team_mention(html, url)
+    features['load_indicator'] = LOAD_MATCHER.first(html.lower()) or ''
+    return features
+
+
+def analyze_section_page(content, encoding, url):
+    """Ищет упоминание размера команды на странице раздела сайта."""
+    return find_size_team_mention(decode_html(content, encoding), url)
+
+
+def analyze_vacancy_page(content, encoding, parser_backend):
+    """Извлекает вакансии поддержки со страницы карьеры."""
+    result = {
+        'vacancies_found': 0,
+        'titles': [],
+        'shift_work': False
+    }
+    html = decode_html(content, encoding)
+    if len(html) <= 100:
+        return result
+    if SHIFT_PATTERN.search(html.lower()):
+        result['shift_work'] = True
+    page = parse_page(html, parser_backend, VACANCY_BLOCK_KEYWORDS)
+    vacancy_candidates = [
+        text for text in page.headings if 10 < len(text) < 100
+    ]
+    vacancy_candidates.extend(
+        text for text, href in page.links
+        if 5 < len(text) < 80 and any(
+            keyword in href.lower() for keyword in VACANCY_HREF_KEYWORDS
+        )
+    )
+    vacancy_candidates.extend(
+        text for _, text in page.blocks if 10 < len(text) < 150
+    )
+    real_vacancies = clean_and_filter_vacancies(vacancy_candidates)
+    result['vacancies_found'] = len(real_vacancies)
+    result['titles'] = real_vacancies[:15]
+    return result
+
+
 def load_companies_from_csv(filepath=RAW_DIR/FILENAME_FOR_CANDIDATES):
     """Загружает компании из CSV-файла."""
     try:
@@ -258,10 +480,169 @@ def load_companies_from_csv(filepath=RAW_DIR/FILENAME_FOR_CANDIDATES):
 class AsyncSiteEnricher:
     """Асинхронный парсинг сайтов компаний."""
 
+    def __init__(
+        self,
+        max_concurrent_companies: int = 20,
+        max_in_flight: int = 50,
+        max_per_host: int = 2,
+        requests_per_second: float = 20,
+        max_connections: int = 100,
+        max_connections_per_host: int = 4,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        request_timeout: float = 30,
+        use_sitemaps: bool = True,
+        max_sitemap_fetches: int = 3,
+        discovery_ttl: float = 7 * 86400,
+        parser_backend: str = DEFAULT_PARSER_BACKEND,
+        parse_workers: int = None,
+        max_pending_parses: int = None,
+        max_page_bytes: int = MAX_PAGE_BYTES,
+        crawl_max_pages: int = 5,
+        crawl_max_bytes: int = 3 * 1024 * 1024,
+        use_http_cache: bool = True,
+        http_cache_ttl: float = 86400,
+        http_cache_max_bytes: int = 256 * 1024 * 1024,
+        breaker_failure_threshold: int = 3,
+        breaker_reset_timeout: float = 300,
+        dead_host_ttl: float = 86400,
+        retry_policy: RetryPolicy = None,
+        adaptive_concurrency: bool = True,
+        target_latency: float = 5.0,
+        max_error_rate: float = 0.2
+    ):
+        self.max_concurrent_companies = max_concurrent_companies
+        self.max_page_bytes = max_page_bytes
+        self.download_stats = {'pages': 0, 'non_html': 0, 'truncated': 0}
+        self.crawl_max_pages = crawl_max_pages
+        self.crawl_max_bytes = crawl_max_bytes
+        self.crawl_stats = {'sites': 0, 'pages': 0, 'bytes': 0, 'found': 0}
+        self.stage_stats = {
+            'sections_run': 0, 'sections_skipped': 0,
+            'career_run': 0, 'career_skipped': 0
+        }
+        self.parser_backend = resolve_backend(parser_backend)
+        self.parse_workers = (
+            multiprocessing.cpu_count() if parse_workers is None
+            else parse_workers
+        )
+        self.parse_semaphore = asyncio.Semaphore(
+            max_pending_parses or 2 * max(1, self.parse_workers)
+        )
+        self.parse_executor = None
+        self.parse_tasks = 0
+        self.parse_time = 0.0
+        self.scheduler = RequestScheduler(
+            max_in_flight=max_in_flight,
+            max_per_host=max_per_host,
+            requests_per_second=requests_per_second
+        )
+        self.limiter = AdaptiveLimiter(
+            initial=max(1, max_in_flight // 2),
+            max_limit=max_in_flight,
+            target_latency=target_latency,
+            max_error_rate=max_error_rate,
+            overload_statuses=SITE_OVERLOAD_STATUSES,
+            count_errors=False
+        ) if adaptive_concurrency else None
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.use_sitemaps = use_sitemaps
+        self.max_sitemap_fetches = max_sitemap_fetches
+        self.discovery_ttl = discovery_ttl
+        self.discovery_cache = None
+        self.use_http_cache = use_http_cache
+        self.http_cache_ttl = http_cache_ttl
+        self.http_cache_max_bytes = http_cache_max_bytes
+        self.http_cache = None
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.dead_host_ttl = dead_host_ttl
+        self.dead_hosts = None
+        self.breaker = None
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=2)
+        self.connection_stats = ConnectionStats()
+        self.session = None
+
+    async def __aenter__(self):
+        """Инициализация общей сессии с пулом соединений."""
+        self.session = create_session(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            dns_ttl=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            request_timeout=self.request_timeout,
+            ssl=False,
+            headers={'Accept': HTML_ACCEPT},
+            stats=self.connection_stats
+        )
+        if self.use_sitemaps:
+            self.discovery_cache = TTLCache(
+                'site_discovery.sqlite3', default_ttl=self.discovery_ttl
+            )
+        self.dead_hosts = TTLCache(
+            'dead_hosts.sqlite3', default_ttl=self.dead_host_ttl
+        )
+        self.breaker = HostCircuitBreaker(
+            failure_threshold=self.breaker_failure_threshold,
+            reset_timeout=self.breaker_reset_timeout,
+            cache=self.dead_hosts,
+            dead_ttl=self.dead_host_ttl
+        )
+        if self.use_http_cache:
+            self.http_cache = HTTPCache(
+                ttl=self.http_cache_ttl, max_bytes=self.http_cache_max_bytes
+            )
+        if self.parse_workers > 0:
+            self.parse_executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Закрытие сессии и вывод статистики соединений."""
+        if self.session:
+            await self.session.close()
+            self.session = None
+        if self.discovery_cache:
+            self.discovery_cache.close()
+            self.discovery_cache = None
+        if self.dead_hosts:
+            logger.info(f'Статистика размыкателя: {self.breaker.stats}')
+            self.dead_hosts.close()
+            self.dead_hosts = None
+        if self.http_cache:
+            logger.info(f'Статистика HTTP-кэша: {self.http_cache.stats}')
+            self.http_cache.close()
+            self.http_cache = None
+        if self.parse_executor:
+            self.parse_executor.shutdown(cancel_futures=True)
+            self.parse_executor = None
+        logger.info(
+            f'Статистика соединений: {self.connection_stats.as_dict()}'
+        )
+        logger.info(f'Статистика планировщика: {self.scheduler.as_dict()}')
+        logger.info(f'Статистика загрузки страниц: {self.download_stats}')
+        logger.info(f'Статистика обхода разделов: {self.crawl_stats}')
+        logger.info(f'Статистика этапов: {self.stage_stats}')
+        logger.info(f'Статистика повторов: {self.retry_policy.as_dict()}')
+        if self.limiter:
+            logger.info(f'Адаптивный лимит: {self.limiter.as_dict()}')
+        logger.info(
+            f'Статистика разбора: задач {self.parse_tasks}, '
+            f'среднее время {self.parse_time / max(1, self.parse_tasks):.3f} с'
+        )
+        return False
+
     async def enrich_companies(self, companies_data):
+        semaphore = asyncio.Semaphore(self.max_concurrent_companies)
+
         async def process_with_semaphore(company_data):
-            async with asyncio.Semaphore(5):
-                await asyncio.sleep(1.5)
+            async with semaphore:
                 return await self.enrich_company(**company_data)
         tasks = [process_with_semaphore(company) for company in companies_data]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -298,30 +679,11 @@ class AsyncSiteEnricher:
         }
         try:
             page_data = await self.fetch_and_parse_page(result['site'])
-            for key in (
-                'has_support_email', 'has_contact_form', 'has_online_chat',
-                'has_messengers', 'has_support_section', 'has_kb_or_faq',
-                'mentions_24_7', 'support_email', 'support_url', 'kb_url',
-                'chat_vendor', 'company_site_vacancies', 'job_titles_found',
-                'jobs_url', 'shift_work_mentioned'
-            ):
-                if key in page_data:
-                    result[key] = page_data[key]
             result['parsed_successfully'] = True
-            all_texts = []
-            if page_data.get('full_text'):
-                all_texts.append((page_data['full_text'], result['site']))
-            if page_data.get(
-                'support_section_text'
-            ) and page_data.get('support_url'):
-                all_texts.append((
-                    page_data['support_section_text'],
-                    page_data['support_url']
-                ))
-            for text_source, source_url in all_texts:
-                team_size, evidence_url, evidence = find_size_team_mention(
-                    text_source, source_url
-                )
+            for team_size, evidence_url, evidence in (
+                page_data.get('team_mention', (0, '', '')),
+                page_data.get('section_mention', (0, '', ''))
+            ):
                 if team_size:
                     result['support_team_size_min'] = team_size
                     result['support_evidence'] = evidence
@@ -329,6 +691,8 @@ class AsyncSiteEnricher:
                     result['evidence_type'] = 'site'
                     break
             if result['support_team_size_min'] < 10:
+                self.stage_stats['career_run'] += 1
+                await self._collect_vacancies(page_data)
                 estimated_size, evidence_url_b, evidence_b = (
                     estimate_size_team_level_b(page_data, result)
                 )
@@ -337,68 +701,240 @@ class AsyncSiteEnricher:
                     result['support_evidence'] = evidence_b
                     result['evidence_url'] = evidence_url_b
                     result['evidence_type'] = 'site'
+            else:
+                self.stage_stats['career_skipped'] += 1
+            for key in (
+                'has_support_email', 'has_contact_form', 'has_online_chat',
+                'has_messengers', 'has_support_section', 'has_kb_or_faq',
+                'mentions_24_7', 'support_email', 'support_url', 'kb_url',
+                'chat_vendor', 'company_site_vacancies', 'job_titles_found',
+                'jobs_url', 'shift_work_mentioned'
+            ):
+                if key in page_data:
+                    result[key] = page_data[key]
         except Exception as e:
             result['error'] = f'{type(e).__name__}: {str(e)}'
             result['parsed_successfully'] = False
             logger.error(f'Ошибка при обработке {name}: {result['error']}')
         return result
 
-    async def fetch_page_text(self, url):
-        """Загружает текст страницы асинхронно."""
+    async def fetch_page_content(self, url, max_bytes=None):
+        """Загружает тело страницы и его кодировку без декодирования."""
+        max_bytes = max_bytes or self.max_page_bytes
+        entry = self.http_cache.get(url) if self.http_cache else None
+        if entry and entry['fresh']:
+            return entry['body'], entry['encoding']
         try:
-            async with aiohttp.ClientSession(headers={
-                **HEADERS,
-                'Accept': (
-                    'text/html,application/xhtml+xml'
-                    ',application/xml;q=0.9,*/*;q=0.8'
+            async with self.retry_policy.request(
+                self.session, 'GET', url, stage='site',
+                headers=HTTPCache.validators(entry),
+                limiter=self.limiter,
+                slot=self.scheduler.attempt_slot(url, self.breaker)
+            ) as response:
+                if response.status == 304 and entry:
+                    self.http_cache.revalidated(url)
+                    return entry['body'], entry['encoding']
+                content, encoding = b'', None
+                if response.status == 200 and not is_html_content_type(
+                    response.headers.get('Content-Type', '')
+                ):
+                    self.download_stats['non_html'] += 1
+                elif response.status == 200:
+                    detector = CharsetDetector(response.charset)
+                    content = await read_limited(
+                        response, max_bytes, detector
+                    )
+                    encoding = detector.close()
+                    self.download_stats['pages'] += 1
+                    if len(content) >= max_bytes:
+                        self.download_stats['truncated'] += 1
+                if self.http_cache and (
+                    response.status in CACHEABLE_STATUSES
+                ):
+                    self.http_cache.set(
+                        url, response.status, content, encoding,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified')
+                    )
+                return content, encoding
+        except Exception:
+            return b'', None
+
+    async def _analyze(self, func, *args):
+        """Выполняет разбор страницы в пуле процессов."""
+        async with self.parse_semaphore:
+            started = time.monotonic()
+            try:
+                if self.parse_executor is None:
+                    return func(*args)
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.parse_executor, func, *args
                 )
-            }) as session:
-                async with session.get(url, ssl=False) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        if html and len(html) > 100:
-                            return html
-                        else:
-                            return ''
-                    else:
-                        return ''
+            finally:
+                self.parse_tasks += 1
+                self.parse_time += time.monotonic() - started
+
+    async def _fetch_bytes(self, url, max_bytes=MAX_SITEMAP_BYTES):
+        """Загружает содержимое ресурса без декодирования.
+
+        Возвращает статус ответа и тело; статус None, если ответа нет.
+        """
+        try:
+            async with self.retry_policy.request(
+                self.session, 'GET', url, stage='site',
+                limiter=self.limiter,
+                slot=self.scheduler.attempt_slot(url, self.breaker)
+            ) as response:
+                if response.status != 200:
+                    return response.status, b''
+                return 200, await read_limited(response, max_bytes)
         except Exception:
-            return ''
+            return None, b''
 
-    async def _find_career_page(self, base_url):
-        """Ищет страницу вакансий на сайте компании."""
+    async def _discover_pages(self, base_url):
+        """Находит разделы сайта по robots.txt и sitemap.xml.
+
+        Результат кэшируется, только если robots.txt или хотя бы один
+        sitemap дали окончательный ответ 200 или 404.
+        """
+        if not self.use_sitemaps:
+            return {}
+        parts = urlsplit(base_url)
+        domain = parts.hostname or base_url
+        cached = self.discovery_cache.get(domain)
+        if cached is not None:
+            return cached
+        root = f'{parts.scheme}://{parts.netloc}/'
         try:
-            career_patterns = (
-                '/career', '/jobs', '/vacancies', '/vacancy', '/rabota',
-                '/about/career', '/company/career', '/company/jobs',
-                '/hr', '/work', '/team', '/careers',
-                '/вакансии', '/карьера', '/работа'
+            status, robots = await self._fetch_bytes(
+                urljoin(root, 'robots.txt')
             )
-            for pattern in career_patterns:
-                url = urljoin(base_url.rstrip('/') + '/', pattern.lstrip('/'))
-                async with aiohttp.ClientSession(headers={
-                    **HEADERS,
-                    'Accept': (
-                        'text/html,application/xhtml+xml,'
-                        'application/xml;q=0.9,*/*;q=0.8'
-                    )
-                }) as session:
-                    async with session.head(
-                        url, ssl=False, allow_redirects=True
-                    ) as response:
-                        if response.status == 200:
-                            return url
-            if html := await self.fetch_page_text(base_url):
-                soup = BeautifulSoup(html, 'html.parser')
-                for link in soup.find_all('a', href=True, limit=50):
-                    if any(keyword in link.get_text(
-                        strip=True
-                    ).lower() for keyword in JOB_KEYWORDS):
-                        return urljoin(base_url, link['href'])
+            reached = status in DEFINITIVE_DISCOVERY_STATUSES
+            queue = parse_robots_sitemaps(
+                robots.decode('utf-8', errors='ignore')
+            ) or [urljoin(root, 'sitemap.xml')]
+            pages = []
+            fetched = 0
+            while queue and fetched < self.max_sitemap_fetches:
+                fetched += 1
+                status, content = await self._fetch_bytes(queue.pop(0))
+                reached = reached or status in DEFINITIVE_DISCOVERY_STATUSES
+                if not content:
+                    continue
+                urls, children = await self._analyze(
+                    parse_sitemap, content, root
+                )
+                pages.extend(urls)
+                queue = sort_child_sitemaps(queue + children)
+            found = await self._analyze(classify_urls, pages, {
+                'jobs': JOB_PATH_KEYWORDS,
+                'support': SUPPORT_PATH_KEYWORDS,
+                'faq': FAQ_PATH_KEYWORDS
+            })
+        except Exception:
+            return {}
+        if reached:
+            self.discovery_cache.set(domain, found)
+        return found
+
+    async def _probe_url(self, url):
+        """Проверяет HEAD-запросом, что страница существует."""
+        key = f'HEAD {url}'
+        entry = self.http_cache.get(key) if self.http_cache else None
+        if entry and entry['fresh']:
+            return url if entry['status'] == 200 else None
+        try:
+            async with self.retry_policy.request(
+                self.session, 'HEAD', url, stage='site',
+                allow_redirects=True,
+                limiter=self.limiter,
+                slot=self.scheduler.attempt_slot(url, self.breaker)
+            ) as response:
+                if self.http_cache and (
+                    response.status in CACHEABLE_STATUSES
+                ):
+                    self.http_cache.set(key, response.status)
+                return url if response.status == 200 else None
+        except Exception:
+            return None
+
+    async def _find_career_page(self, base_url, career_link=None):
+        """Ищет страницу вакансий на сайте компании."""
+        try:
+            probes = [
+                asyncio.create_task(self._probe_url(urljoin(
+                    base_url.rstrip('/') + '/', pattern.lstrip('/')
+                )))
+                for pattern in CAREER_PATTERNS
+            ]
+            try:
+                for probe in asyncio.as_completed(probes):
+                    if url := await probe:
+                        return url
+            finally:
+                for probe in probes:
+                    probe.cancel()
+                await asyncio.gather(*probes, return_exceptions=True)
+            if career_link is None:
+                career_link = ''
+                content, encoding = await self.fetch_page_content(base_url)
+                if content and (features := await self._analyze(
+                    analyze_homepage, content, encoding, base_url,
+                    self.parser_backend
+                )):
+                    career_link = features['career_link']
+            return career_link or None
         except Exception:
             pass
         return None
 
+    async def _check_section_page(self, url, max_bytes):
+        """Загружает страницу раздела и ищет на ней упоминание уровня A."""
+        content, encoding = await self.fetch_page_content(url, max_bytes)
+        if not content:
+            return 0, '', ''
+        self.crawl_stats['pages'] += 1
+        self.crawl_stats['bytes'] += len(content)
+        return await self._analyze(
+            analyze_section_page, content, encoding, url
+        )
+
+    async def _crawl_sections(self, base_url, urls):
+        """Обходит разделы поддержки и контактов до первого упоминания."""
+        seen = {url_key(base_url)}
+        queue = []
+        for url in urls:
+            if url and is_same_site(url, base_url) and (
+                key := url_key(url)
+            ) not in seen:
+                seen.add(key)
+                queue.append(url)
+        queue = queue[:self.crawl_max_pages]
+        if not queue:
+            return 0, '', ''
+        self.crawl_stats['sites'] += 1
+        max_bytes = min(
+            self.max_page_bytes, self.crawl_max_bytes // len(queue)
+        )
+        checks = [
+            asyncio.create_task(self._check_section_page(url, max_bytes))
+            for url in queue
+        ]
+        try:
+            for check in asyncio.as_completed(checks):
+                try:
+                    mention = await check
+                except Exception:
+                    continue
+                if mention[0]:
+                    self.crawl_stats['found'] += 1
+                    return mention
+        finally:
+            for check in checks:
+                check.cancel()
+            await asyncio.gather(*checks, return_exceptions=True)
+        return 0, '', ''
+
     async def _parse_vacancies_from_page(self, url):
         """Парсит вакансий на сайте компании."""
         result = {
@@ -407,44 +943,12 @@ class AsyncSiteEnricher:
             'shift_work': False
         }
         try:
-            html = await self.fetch_page_text(url)
-            if not html:
-                return result
-            shift_regex = re.compile(
-                r'24[/×]7|круглосуточно|сменн[а-яё]*\s+график|'
-                r'2/2|3/3|ночн[а-яё]*\s+смен[ау]?|посменн[а-яё]*|'
-                r'сменн[а-яё]+\s+работ',
-                re.IGNORECASE
-            )
-            if shift_regex.search(html.lower()):
-                result['shift_work'] = True
-            soup = BeautifulSoup(html, 'html.parser')
-            vacancy_candidates = []
-            for tag in soup.find_all(('h1', 'h2', 'h3', 'h4')):
-                text = tag.get_text(strip=True)
-                if text and 10 < len(text) < 100:
-                    vacancy_candidates.append(text)
-            for link in soup.find_all('a', href=True):
-                text = link.get_text(strip=True)
-                href = link['href'].lower()
-                if (text and 5 < len(text) < 80 and (
-                    'ваканс' in href or 'vacancy' in href or 'job' in href or
-                    'работа' in href or 'career' in href
-                )):
-                    vacancy_candidates.append(text)
-            for elem in soup.find_all(('div', 'li', 'span')):
-                if any(vac_word in ' '.join(elem.get('class', [])).lower(
-                ) for vac_word in (
-                    'vacancy', 'job', 'position', 'vacans', 'rabota'
-                )):
-                    text = elem.get_text(strip=True)
-                    if text and 10 < len(text) < 150:
-                        vacancy_candidates.append(text)
-            real_vacancies = self._clean_and_filter_vacancies(
-                vacancy_candidates
-            )
-            result['vacancies_found'] = len(real_vacancies)
-            result['titles'] = real_vacancies[:15]
+            content, encoding = await self.fetch_page_content(url)
+            if content:
+                return await self._analyze(
+                    analyze_vacancy_page, content, encoding,
+                    self.parser_backend
+                )
         except Exception:
             pass
         return result
@@ -452,8 +956,10 @@ class AsyncSiteEnricher:
     async def fetch_and_parse_page(self, url):
         """Асинхронно загружает страницу и извлекает признаки."""
         data = {
-            'full_text': '',
-            'support_section_text': '',
+            'team_mention': (0, '', ''),
+            'section_mention': (0, '', ''),
+            'career_sources': None,
+            'load_indicator': '',
             'has_support_email': False,
             'has_contact_form': False,
             'has_online_chat': False,
@@ -471,63 +977,49 @@ class AsyncSiteEnricher:
             'shift_work_mentioned': False
         }
         try:
-            html = await self.fetch_page_text(url)
-            if not html:
+            (content, encoding), discovered = await asyncio.gather(
+                self.fetch_page_content(url), self._discover_pages(url)
+            )
+            if not content:
                 return data
-            soup = BeautifulSoup(html, 'html.parser')
-            data['full_text'] = html
-            visible_text = soup.get_text(separator=' ', strip=True)
-            data['page_text'] = visible_text[:5000]
-            email_pattern = (
-                r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'
+            features = await self._analyze(
+                analyze_homepage, content, encoding, url, self.parser_backend
+            )
+            if not features:
+                return data
+            career_link = features.pop('career_link')
+            crawl_links = features.pop('crawl_links')
+            data.update(features)
+            if discovered.get('support') and not data['support_url']:
+                data['has_support_section'] = True
+                data['support_url'] = discovered['support']
+            if discovered.get('faq') and not data['kb_url']:
+                data['has_kb_or_faq'] = True
+                data['kb_url'] = discovered['faq']
+            data['career_sources'] = (
+                url, discovered.get('jobs', ''), career_link
+            )
+            if data['team_mention'][0]:
+                self.stage_stats['sections_skipped'] += 1
+            else:
+                self.stage_stats['sections_run'] += 1
+                data['section_mention'] = await self._crawl_sections(url, [
+                    data['support_url'], data['kb_url'], *crawl_links
+                ])
+        except Exception:
+            pass
+        return data
+
+    async def _collect_vacancies(self, data):
+        """Ищет страницу карьеры и вакансии, когда нужен уровень B."""
+        if not data.get('career_sources'):
+            return
+        url, discovered_jobs, career_link = data['career_sources']
+        try:
+            career_page = (
+                career_link or discovered_jobs
+                or await self._find_career_page(url, career_link)
             )
-            text_emails = re.findall(email_pattern, html)
-            mailto_emails = [
-                a['href'][7:]
-                for a in soup.find_all('a', href=True)
-                if a['href'].startswith('mailto:')
-            ]
-            all_emails = text_emails + mailto_emails
-            if all_emails:
-                support_emails = [e for e in all_emails if e.lower(
-                ).startswith(('support@', 'help@'))]
-                if support_emails:
-                    data['has_support_email'] = True
-                    data['support_email'] = support_emails[0]
-                else:
-                    data['has_support_email'] = True
-                    data['support_email'] = all_emails[0]
-            if soup.find_all('form'):
-                form_text = str(soup).lower()
-                if any(keyword in form_text for keyword in (
-                    'form', 'contact', 'обратн', 'заявк')
-                ):
-                    data['has_contact_form'] = True
-            for vendor in CHAT_INDICATORS:
-                if vendor in html.lower():
-                    data['has_online_chat'] = True
-                    data['chat_vendor'] = vendor
-                    break
-            for messenger in MESSENGERS:
-                if messenger in html.lower():
-                    data['has_messengers'] = True
-                    break
-            for link in soup.find_all('a', href=True, limit=100):
-                if (any(k in link.get_text(strip=True).lower(
-                ) for k in SUPPORT_KEYWORDS) or any(k in link['href'].lower(
-                ) for k in ['support', 'help', 'contact', 'faq'])):
-                    data['has_support_section'] = True
-                    data['support_url'] = urljoin(url, link['href'])
-                    break
-            for link in soup.find_all('a', href=True, limit=50):
-                if any(keyword in link.get_text(strip=True).lower(
-                ) for keyword in FAQ_KEYWORDS):
-                    data['has_kb_or_faq'] = True
-                    data['kb_url'] = urljoin(url, link['href'])
-                    break
-            if '24/7' in html.lower() or 'круглосуточно' in html.lower():
-                data['mentions_24_7'] = True
-            career_page = await self._find_career_page(url)
             if career_page:
                 data['jobs_url'] = career_page
                 vacancies_data = await self._parse_vacancies_from_page(
@@ -540,44 +1032,19 @@ class AsyncSiteEnricher:
                 data['shift_work_mentioned'] = vacancies_data['shift_work']
         except Exception:
             pass
-        return data
-
-    def _clean_and_filter_vacancies(self, job_titles):
-        """Очищает и фильтрует список вакансий, оставляя только реальные."""
-        real_vacancies = set()
-        for title in job_titles:
-            if not title or len(title) < 5:
-                continue
-            exclude_patterns = (
-                r'©', r'copyright', r'все права', r'политика',
-                r'конфиденциальност', r'карта сайта', r'cookie',
-                r'использование файлов', r'пример', r'образец',
-                r'продукт', r'услуг', r'решен', r'тариф', r'цена',
-                r'контакт', r'о компани', r'отзыв', r'новост', r'блог',
-                r'документ', r'инструкц', r'faq', r'база знаний',
-                r'компенсац', r'льгот', r'преимуществ', r'бонус',
-                r'забота', r'поддержк.*сем', r'материальн.*поддержк',
-                r'шаблон', r'тестов', r'демо', r'социальн.*поддержк'
-            )
-            if any(re.search(
-                pattern, title.lower()
-            ) for pattern in exclude_patterns):
-                continue
-            if not any(re.search(
-                pattern, title.lower()
-            ) for pattern in SUPPORT_JOB_PATTERNS):
-                continue
-            real_vacancies.add(' '.join(title.split()[:8]))
-        return list(real_vacancies)
 
 
-async def run_async_enrichment(output_file=RAW_DIR/FILENAME_FOR_PARSE_SITES):
+async def run_async_enrichment(
+    output_file=RAW_DIR/FILENAME_FOR_PARSE_SITES,
+    **enricher_options
+):
     """Основная асинхронная функция запуска парсинга."""
     companies_data = load_companies_from_csv()
     if not companies_data:
         logger.info('Нет компаний для обработки.')
         return None
-    results = await AsyncSiteEnricher().enrich_companies(companies_data)
+    async with AsyncSiteEnricher(**enricher_options) as enricher:
+        results = await enricher.enrich_companies(companies_data)
     final_df = pd.DataFrame(results)
     if not final_df.empty:
         bool_cols = (
@@ -607,7 +1074,7 @@ async def run_async_enrichment(output_file=RAW_DIR/FILENAME_FOR_PARSE_SITES):
     return final_df
 
 
-async def main():
+async def main(**enricher_options):
     """Основная функция запуска."""
-    results_df = await run_async_enrichment()
+    results_df = await run_async_enrichment(**enricher_options)
     return results_df
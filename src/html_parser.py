@@ -0,0 +1,272 @@
+from dataclasses import dataclass, field
+from html import unescape
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+try:
+    from lxml import etree as lxml_etree
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_etree = lxml_html = None
+
+from . import logger
+
+PARSER_BACKENDS = ('lxml', 'stream', 'html.parser')
+DEFAULT_PARSER_BACKEND = 'lxml' if lxml_html is not None else 'html.parser'
+HIDDEN_TAGS = frozenset(('script', 'style', 'template'))
+RAW_TEXT_TAGS = frozenset(('textarea', 'title'))
+HEADING_TAGS = frozenset(('h1', 'h2', 'h3', 'h4'))
+BLOCK_TAGS = frozenset(('div', 'li', 'span'))
+VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+    'command', 'frame', 'image', 'isindex', 'keygen', 'menuitem', 'nextid',
+    'spacer'
+))
+MULTI_VALUED_ATTRIBUTES = frozenset((
+    'class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey',
+    'dropzone'
+))
+
+
+@dataclass
+class ParsedPage:
+    """Элементы страницы, из которых извлекаются признаки."""
+    visible_text: str = ''
+    markup_text: str = ''
+    links: list = field(default_factory=list)
+    has_form: bool = False
+    headings: list = field(default_factory=list)
+    blocks: list = field(default_factory=list)
+
+
+class _PageCollector:
+    """Собирает ParsedPage из потока событий любого парсера."""
+
+    def __init__(self, block_keywords=()):
+        self.block_keywords = block_keywords
+        self.page = ParsedPage()
+        self.visible = []
+        self.markup_parts = []
+        self.stack = []
+        self.hidden_depth = 0
+
+    def start(self, tag, attrs):
+        values = {}
+        for name, value in attrs:
+            if value is None:
+                value = ''
+            elif isinstance(value, list):
+                value = ' '.join(value)
+            elif name in MULTI_VALUED_ATTRIBUTES:
+                value = ' '.join(value.split())
+            values[name] = value
+            self.markup_parts.append(value)
+        if tag == 'form':
+            self.page.has_form = True
+        if tag in VOID_TAGS:
+            return
+        if tag == 'a':
+            self.end('a')
+        target = None
+        if tag == 'a' and 'href' in values:
+            target = self.page.links
+            target.append(('', values['href']))
+        elif tag in HEADING_TAGS:
+            target = self.page.headings
+            target.append('')
+        elif tag in BLOCK_TAGS and self.block_keywords and any(
+            keyword in values.get('class', '').lower()
+            for keyword in self.block_keywords
+        ):
+            target = self.page.blocks
+            target.append((values['class'].lower(), ''))
+        if tag in HIDDEN_TAGS:
+            self.hidden_depth += 1
+        self.stack.append((
+            tag, [] if target is not None else None,
+            target, len(target) - 1 if target is not None else None
+        ))
+
+    def end(self, tag):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > index:
+            self._close(self.stack.pop())
+
+    def _close(self, record):
+        tag, buffer, target, position = record
+        if tag in HIDDEN_TAGS:
+            self.hidden_depth -= 1
+        if target is None:
+            return
+        text = ''.join(buffer)
+        if target is self.page.headings:
+            target[position] = text
+        elif target is self.page.blocks:
+            target[position] = (target[position][0], text)
+        else:
+            target[position] = (text, target[position][1])
+
+    def data(self, text):
+        if self.hidden_depth:
+            self.markup_parts.append(text)
+            return
+        if stripped := text.strip():
+            self.visible.append(stripped)
+            for _, buffer, _, _ in self.stack:
+                if buffer is not None:
+                    buffer.append(stripped)
+
+    def markup(self, text):
+        self.markup_parts.append(text)
+
+    def close(self):
+        while self.stack:
+            self._close(self.stack.pop())
+        self.page.visible_text = ' '.join(self.visible)
+        self.page.markup_text = ' '.join(self.markup_parts)
+        return self.page
+
+
+class _StreamingTokenizer(HTMLParser):
+    """Потоковый токенизатор без построения дерева документа.
+
+    Содержимое textarea и title, как в браузере и lxml, читается текстом.
+    """
+
+    CDATA_CONTENT_ELEMENTS = ('script', 'style', *sorted(RAW_TEXT_TAGS))
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+        self.pending = []
+
+    def _flush(self):
+        if self.pending:
+            self.collector.data(''.join(self.pending))
+            self.pending = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        self.collector.start(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        self.collector.start(tag, attrs)
+        self.collector.end(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        if self.cdata_elem in RAW_TEXT_TAGS:
+            data = unescape(data)
+        self.pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+        self.collector.markup(data)
+
+    def handle_decl(self, decl):
+        self._flush()
+        self.collector.markup(decl)
+
+    def handle_pi(self, data):
+        self._flush()
+        self.collector.markup(data)
+
+    def unknown_decl(self, data):
+        self._flush()
+        self.collector.markup(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _parse_with_stream(html, collector):
+    tokenizer = _StreamingTokenizer(collector)
+    tokenizer.feed(html)
+    tokenizer.close()
+
+
+def _parse_with_lxml(html, collector):
+    try:
+        root = lxml_html.document_fromstring(
+            html.encode('utf-8', errors='replace'),
+            parser=lxml_html.HTMLParser(encoding='utf-8')
+        )
+    except lxml_etree.ParserError:
+        return
+    for event, element in lxml_etree.iterwalk(
+        root, events=('start', 'end', 'comment', 'pi')
+    ):
+        if event == 'start':
+            collector.start(element.tag, element.attrib.items())
+            if element.text:
+                collector.data(element.text)
+            continue
+        if event == 'end':
+            collector.end(element.tag)
+        elif element.text:
+            collector.markup(element.text)
+        if element.tail:
+            collector.data(element.tail)
+
+
+def _parse_with_soup(html, collector):
+    nodes = [iter(make_soup(html, 'html.parser').contents)]
+    tags = [None]
+    while nodes:
+        node = next(nodes[-1], None)
+        if node is None:
+            nodes.pop()
+            if tag := tags.pop():
+                collector.end(tag)
+        elif isinstance(node, Tag) and node.name in RAW_TEXT_TAGS:
+            collector.start(node.name, node.attrs.items())
+            collector.data(unescape(node.decode_contents()))
+            collector.end(node.name)
+        elif isinstance(node, Tag):
+            collector.start(node.name, node.attrs.items())
+            nodes.append(iter(node.contents))
+            tags.append(node.name)
+        elif type(node) in (NavigableString, CData):
+            collector.data(node)
+        else:
+            collector.markup(node)
+
+
+def resolve_backend(backend):
+    """Проверяет бэкенд и откатывается на html.parser без lxml."""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f'Неизвестный парсер HTML: {backend}')
+    if backend == 'lxml' and lxml_html is None:
+        logger.warning('lxml не установлен, используется html.parser')
+        return 'html.parser'
+    return backend
+
+
+def make_soup(html, backend=DEFAULT_PARSER_BACKEND):
+    """Строит BeautifulSoup на построителе lxml, если он выбран."""
+    if backend == 'lxml' and lxml_html is not None:
+        return BeautifulSoup(html, 'lxml')
+    return BeautifulSoup(html, 'html.parser')
+
+
+def parse_page(html, backend=DEFAULT_PARSER_BACKEND, block_keywords=()):
+    """Разбирает HTML выбранным бэкендом в ParsedPage."""
+    collector = _PageCollector(block_keywords)
+    if backend == 'lxml' and lxml_html is not None:
+        _parse_with_lxml(html, collector)
+    elif backend == 'stream':
+        _parse_with_stream(html, collector)
+    else:
+        _parse_with_soup(html, collector)
+    return collector.close()
@@ -0,0 +1,192 @@
+import asyncio
+import codecs
+import re
+
+import aiohttp
+
+from . import HEADERS
+
+HTML_ACCEPT = (
+    'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+)
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 65536
+FALLBACK_ENCODING = 'cp1251'
+META_CHARSET_PATTERN = re.compile(
+    rb'<meta[^>]+?charset\s*=\s*["\']?\s*([a-z0-9_.:-]+)', re.IGNORECASE
+)
+CONNECTION_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, OSError)
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
+
+def lookup_encoding(name):
+    """Возвращает каноническое имя кодировки или None."""
+    if isinstance(name, bytes):
+        name = name.decode('ascii', errors='ignore')
+    try:
+        return codecs.lookup(name).name if name else None
+    except LookupError:
+        return None
+
+
+def is_html_content_type(content_type):
+    """Проверяет, что ответ содержит HTML или тип не указан."""
+    mimetype = content_type.partition(';')[0].strip().lower()
+    return not mimetype or mimetype in HTML_CONTENT_TYPES
+
+
+class CharsetDetector:
+    """Определяет кодировку тела ответа по мере его загрузки."""
+
+    def __init__(self, declared=None, sniff_bytes=4096):
+        self.encoding = lookup_encoding(declared)
+        self.sniff_bytes = sniff_bytes
+        self.head = bytearray()
+        self.utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.utf8_valid = True
+        self.truncated = False
+
+    def feed(self, chunk):
+        """Учитывает очередной фрагмент тела."""
+        if len(self.head) < self.sniff_bytes:
+            self.head.extend(chunk[:self.sniff_bytes - len(self.head)])
+            self._sniff()
+        if self.encoding is None and self.utf8_valid:
+            try:
+                self.utf8_decoder.decode(chunk)
+            except UnicodeDecodeError:
+                self.utf8_valid = False
+
+    def _sniff(self):
+        for bom, encoding in BOM_ENCODINGS:
+            if self.head.startswith(bom):
+                self.encoding = encoding
+                return
+        if self.encoding is None and (
+            match := META_CHARSET_PATTERN.search(self.head)
+        ):
+            encoding = lookup_encoding(match.group(1))
+            if encoding and not encoding.startswith('utf-16'):
+                self.encoding = encoding
+
+    def close(self):
+        """Возвращает итоговую кодировку.
+
+        У обрезанного тела незавершенный символ в конце не считается
+        ошибкой UTF-8.
+        """
+        if self.encoding:
+            return self.encoding
+        if self.utf8_valid and not self.truncated:
+            try:
+                self.utf8_decoder.decode(b'', final=True)
+            except UnicodeDecodeError:
+                self.utf8_valid = False
+        return 'utf-8' if self.utf8_valid else FALLBACK_ENCODING
+
+
+async def read_limited(response, max_bytes, detector=None):
+    """Читает тело ответа потоком, не больше max_bytes."""
+    content = bytearray()
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        chunk = chunk[:max_bytes - len(content)]
+        if detector:
+            detector.feed(chunk)
+        content.extend(chunk)
+        if len(content) >= max_bytes:
+            if detector:
+                detector.truncated = True
+            break
+    return bytes(content)
+
+
+class ConnectionStats:
+    """Статистика создания и переиспользования соединений пула."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_resolved = 0
+        self.dns_cache_hits = 0
+
+    def trace_config(self):
+        """Создает TraceConfig, обновляющий счетчики."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(
+            self._on_connection_create_end
+        )
+        trace_config.on_connection_reuseconn.append(
+            self._on_connection_reuseconn
+        )
+        trace_config.on_dns_resolvehost_end.append(
+            self._on_dns_resolvehost_end
+        )
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        return trace_config
+
+    async def _on_request_start(self, session, context, params):
+        self.requests += 1
+
+    async def _on_connection_create_end(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context, params):
+        self.connections_reused += 1
+
+    async def _on_dns_resolvehost_end(self, session, context, params):
+        self.dns_resolved += 1
+
+    async def _on_dns_cache_hit(self, session, context, params):
+        self.dns_cache_hits += 1
+
+    @property
+    def reuse_ratio(self):
+        """Доля запросов, выполненных на уже открытом соединении."""
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def as_dict(self):
+        """Возвращает счетчики в виде словаря."""
+        return {
+            'requests': self.requests,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'reuse_ratio': round(self.reuse_ratio, 3),
+            'dns_resolved': self.dns_resolved,
+            'dns_cache_hits': self.dns_cache_hits,
+        }
+
+
+def create_session(
+    limit=100,
+    limit_per_host=4,
+    dns_ttl=300,
+    keepalive_timeout=30,
+    request_timeout=30,
+    ssl=True,
+    headers=None,
+    stats=None
+):
+    """Создает долгоживущую сессию с пулом keep-alive соединений."""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=dns_ttl,
+        use_dns_cache=True,
+        keepalive_timeout=keepalive_timeout,
+        enable_cleanup_closed=True,
+        ssl=ssl
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=request_timeout),
+        headers={**HEADERS, **(headers or {})},
+        trace_configs=[stats.trace_config()] if stats else None
+    )
@@ -0,0 +1,104 @@
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class _PythonAutomaton:
+    """Автомат Ахо–Корасик на чистом Python для окружений без pyahocorasick."""
+
+    def __init__(self, keywords):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [()]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self.transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self.transitions)
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                    self.transitions[state][char] = next_state
+                state = next_state
+            self.outputs[state] += (keyword,)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(char, 0)
+                self.outputs[next_state] += self.outputs[
+                    self.fail[next_state]
+                ]
+
+    def iter(self, text):
+        transitions = self.transitions
+        fail = self.fail
+        outputs = self.outputs
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            for keyword in outputs[state]:
+                yield index, keyword
+
+
+class KeywordMatcher:
+    """Поиск всех ключевых слов из набора за один проход по тексту."""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(k for k in keywords if k))
+        self.ranks = {
+            keyword: rank for rank, keyword in enumerate(self.keywords)
+        }
+        self._automaton = None
+
+    @property
+    def automaton(self):
+        """Строит автомат при первом использовании."""
+        if self._automaton is None:
+            if ahocorasick is not None:
+                automaton = ahocorasick.Automaton()
+                for keyword in self.keywords:
+                    automaton.add_word(keyword, keyword)
+                automaton.make_automaton()
+                self._automaton = automaton
+            else:
+                self._automaton = _PythonAutomaton(self.keywords)
+        return self._automaton
+
+    def iter_matches(self, text):
+        """Перебирает вхождения (позиция начала, ключевое слово)."""
+        if not self.keywords or not text:
+            return
+        for end, keyword in self.automaton.iter(text):
+            yield end - len(keyword) + 1, keyword
+
+    def find_all(self, text):
+        """Возвращает все вхождения с позициями."""
+        return list(self.iter_matches(text))
+
+    def found(self, text):
+        """Возвращает множество слов, встретившихся в тексте."""
+        if not self.keywords or not text:
+            return set()
+        return {keyword for _, keyword in self.automaton.iter(text)}
+
+    def search(self, text):
+        """Проверяет, встречается ли в тексте хотя бы одно слово."""
+        if not self.keywords or not text:
+            return False
+        return next(self.automaton.iter(text), None) is not None
+
+    def first(self, text):
+        """Возвращает найденное слово, стоящее раньше всех в наборе."""
+        found = self.found(text)
+        return min(found, key=self.ranks.__getitem__) if found else None
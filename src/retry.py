@@ -0,0 +1,133 @@
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+import random
+import time
+
+from .http_client import CONNECTION_ERRORS
+
+RETRY_STATUSES = frozenset((408, 425, 429, 500, 502, 503, 504))
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+
+def parse_retry_after(value):
+    """Переводит заголовок Retry-After в секунды ожидания."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Повтор запросов с экспоненциальной задержкой и общим лимитом."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+        max_retries: int = 1000
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries_left = max_retries
+        self.stats = defaultdict(
+            lambda: {'requests': 0, 'retries': 0, 'failed': 0}
+        )
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    def _take_retry(self, stage, attempt, retry_after=None):
+        if attempt >= self.max_attempts or self.retries_left <= 0 or (
+            retry_after is not None and retry_after > self.max_delay
+        ):
+            self.stats[stage]['failed'] += 1
+            return False
+        self.retries_left -= 1
+        self.stats[stage]['retries'] += 1
+        return True
+
+    @asynccontextmanager
+    async def request(
+        self, session, method, url, stage='default', idempotent=None,
+        limiter=None, rate_limiter=None, slot=None, **kwargs
+    ):
+        """Выполняет запрос, повторяя его при временных ошибках.
+
+        Если переданы limiter, slot и rate_limiter, каждая попытка занимает
+        в них место и токен и сообщает им свой исход; паузы между попытками
+        место не держат. Адаптивный limiter занимается первым, чтобы
+        ожидающие его попытки не держали места планировщика.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        limiters = [item for item in (limiter, slot, rate_limiter) if item]
+        attempt = 0
+        while True:
+            attempt += 1
+            self.stats[stage]['requests'] += 1
+            acquired = []
+            started = time.monotonic()
+            try:
+                for item in limiters:
+                    await item.acquire()
+                    acquired.append(item)
+                started = time.monotonic()
+                response = await session.request(method, url, **kwargs)
+            except BaseException as error:
+                for item in acquired:
+                    item.release(started, error=error)
+                if not (
+                    isinstance(error, CONNECTION_ERRORS) and idempotent
+                    and self._take_retry(stage, attempt)
+                ):
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            retry_after = parse_retry_after(
+                response.headers.get('Retry-After')
+            ) if response.status in RETRY_STATUSES else None
+            if idempotent and response.status in RETRY_STATUSES and (
+                self._take_retry(stage, attempt, retry_after)
+            ):
+                response.release()
+                for item in limiters:
+                    item.release(
+                        started, status=response.status,
+                        retry_after=retry_after
+                    )
+                await asyncio.sleep(self._delay(attempt, retry_after))
+                continue
+            error = None
+            try:
+                yield response
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                response.release()
+                for item in limiters:
+                    item.release(
+                        started, status=response.status, error=error,
+                        retry_after=retry_after
+                    )
+            return
+
+    def as_dict(self):
+        """Возвращает счетчики повторов по этапам."""
+        return {
+            stage: dict(counters) for stage, counters in self.stats.items()
+        }
@@ -0,0 +1,149 @@
+import re
+from urllib.parse import unquote, urlsplit
+import xml.etree.ElementTree as ET
+import zlib
+
+from .keyword_matcher import KeywordMatcher
+
+MAX_SITEMAP_BYTES = 4 * 1024 * 1024
+SITEMAP_CHUNK_BYTES = 64 * 1024
+MAX_SITEMAP_URLS = 50000
+SITEMAP_LOW_PRIORITY_HINTS = (
+    'product', 'goods', 'catalog', 'item', 'news', 'blog', 'article',
+    'image', 'video', 'tag', 'offer', 'shop', 'store'
+)
+TOKEN_SEPARATORS = re.compile(r'[\s/\-_.,:;?=&+%~]+')
+
+
+def parse_robots_sitemaps(robots_text):
+    """Извлекает адреса sitemap из robots.txt."""
+    sitemaps = []
+    for line in robots_text.splitlines():
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'sitemap' and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def iter_sitemap_chunks(content, max_bytes=MAX_SITEMAP_BYTES):
+    """Отдает sitemap частями, распаковывая gzip по мере чтения.
+
+    Суммарный объем частей не превышает max_bytes.
+    """
+    if content[:2] != b'\x1f\x8b':
+        content = content[:max_bytes]
+        for start in range(0, len(content), SITEMAP_CHUNK_BYTES):
+            yield content[start:start + SITEMAP_CHUNK_BYTES]
+        return
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = content
+    while max_bytes > 0 and not decompressor.eof:
+        try:
+            chunk = decompressor.decompress(
+                pending, min(SITEMAP_CHUNK_BYTES, max_bytes)
+            )
+        except zlib.error:
+            return
+        if not chunk:
+            return
+        max_bytes -= len(chunk)
+        pending = decompressor.unconsumed_tail
+        yield chunk
+
+
+def parse_sitemap(content, base_url=None):
+    """Разбирает sitemap, возвращает адреса страниц и вложенных sitemap.
+
+    Документ подается разборщику частями, разбор прекращается после
+    MAX_SITEMAP_URLS адресов. Если задан base_url, из адресов страниц
+    остаются только страницы этого сайта.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    locations = []
+    is_index = False
+    try:
+        for chunk in iter_sitemap_chunks(content):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                tag = element.tag.rsplit('}', 1)[-1]
+                if event == 'start':
+                    is_index = is_index or tag == 'sitemapindex'
+                    continue
+                if tag == 'loc' and element.text:
+                    locations.append(element.text.strip())
+                element.clear()
+            if len(locations) >= MAX_SITEMAP_URLS:
+                del locations[MAX_SITEMAP_URLS:]
+                break
+    except ET.ParseError:
+        pass
+    if is_index:
+        return [], locations
+    if base_url is not None:
+        locations = [url for url in locations if is_same_site(url, base_url)]
+    return locations, []
+
+
+def sort_child_sitemaps(sitemaps):
+    """Ставит вперед вложенные sitemap с общими страницами сайта."""
+    return sorted(sitemaps, key=lambda url: (
+        any(hint in url.lower() for hint in SITEMAP_LOW_PRIORITY_HINTS),
+        len(url)
+    ))
+
+
+def tokenize(text):
+    """Разбивает строку на токены в нижнем регистре."""
+    return [token for token in TOKEN_SEPARATORS.split(text.lower()) if token]
+
+
+def path_tokens(url):
+    """Разбивает путь URL на токены."""
+    return tokenize(unquote(urlsplit(url).path))
+
+
+def is_same_site(url, base_url):
+    """Проверяет, что url относится к сайту base_url или его поддомену."""
+    host = (urlsplit(url).hostname or '').removeprefix('www.')
+    base_host = (urlsplit(base_url).hostname or '').removeprefix('www.')
+    return bool(host) and (
+        host == base_host or host.endswith('.' + base_host)
+    )
+
+
+def url_key(url):
+    """Ключ для устранения дублей URL: без схемы, фрагмента и слеша."""
+    parts = urlsplit(url)
+    host = (parts.hostname or '').removeprefix('www.')
+    key = f'{host}{parts.path.rstrip("/")}'
+    return f'{key}?{parts.query}' if parts.query else key
+
+
+def classify_urls(urls, categories):
+    """Находит для каждой категории самый общий URL по токенам пути."""
+    ranks = {
+        category: {
+            keyword: rank for rank, keyword in reversed(list(enumerate(
+                ' ' + ' '.join(tokens)
+                for tokens in map(tokenize, keywords) if tokens
+            )))
+        }
+        for category, keywords in categories.items()
+    }
+    matcher = KeywordMatcher(
+        keyword for keywords in ranks.values() for keyword in keywords
+    )
+    best = {}
+    for url in urls:
+        tokens = path_tokens(url)
+        if not tokens:
+            continue
+        found = matcher.found(' ' + ' '.join(tokens))
+        for category, keyword_ranks in ranks.items():
+            matched = [keyword_ranks[k] for k in found if k in keyword_ranks]
+            if not matched:
+                continue
+            key = (len(tokens), min(matched), len(url))
+            if category not in best or key < best[category][0]:
+                best[category] = (key, url)
+    return {category: url for category, (_, url) in best.items()}
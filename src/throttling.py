@@ -0,0 +1,399 @@
+import asyncio
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+import time
+from urllib.parse import urlsplit
+
+from .http_client import CONNECTION_ERRORS
+
+OVERLOAD_STATUSES = frozenset((429, 500, 502, 503, 504))
+SITE_OVERLOAD_STATUSES = frozenset((429, 503))
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов по алгоритму token bucket."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    async def acquire(self):
+        """Ждет появления токена и забирает его."""
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket, который замедляется на 429 и затем восстанавливается.
+
+    На 429 частота умножается на backoff (не чаще раза в cooldown секунд),
+    а при Retry-After выдача токенов приостанавливается до конца окна
+    квоты. Каждый успешный ответ возвращает recovery запросов в секунду,
+    пока частота не достигнет исходной.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = None,
+        min_rate: float = 0.5,
+        backoff: float = 0.5,
+        recovery: float = 0.1,
+        cooldown: float = 1.0
+    ):
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.backoff = backoff
+        self.recovery = recovery
+        self.cooldown = cooldown
+        self.paused_until = 0.0
+        self.decreased_at = float('-inf')
+        self.stats = {'throttled': 0, 'paused': 0.0}
+
+    async def acquire(self):
+        """Ждет окончания паузы по Retry-After и забирает токен."""
+        while (delay := self.paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        await super().acquire()
+
+    def _set_rate(self, rate):
+        self._refill()
+        self.rate = rate
+
+    def release(self, started, status=None, error=None, retry_after=None):
+        """Подстраивает частоту по ответу сервера."""
+        if status == 429:
+            now = time.monotonic()
+            self.stats['throttled'] += 1
+            if now - self.decreased_at >= self.cooldown:
+                self.decreased_at = now
+                self._set_rate(max(self.min_rate, self.rate * self.backoff))
+            if retry_after and now + retry_after > self.paused_until:
+                self.stats['paused'] += now + retry_after - max(
+                    now, self.paused_until
+                )
+                self.paused_until = now + retry_after
+                self.tokens = 0.0
+        elif status is not None and status < 500 and (
+            self.rate < self.max_rate
+        ):
+            self._set_rate(min(self.max_rate, self.rate + self.recovery))
+
+    def as_dict(self):
+        """Возвращает текущую частоту и статистику ограничений."""
+        return {
+            'rate': round(self.rate, 2),
+            'max_rate': self.max_rate,
+            'throttled': self.stats['throttled'],
+            'paused': round(self.stats['paused'], 1),
+        }
+
+
+class RequestScheduler:
+    """Глобальный лимит запросов, лимит на домен и общий rate limit."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 50,
+        max_per_host: int = 2,
+        requests_per_second: float = 20
+    ):
+        self.max_per_host = max_per_host
+        self.global_semaphore = asyncio.Semaphore(max_in_flight)
+        self.host_semaphores = defaultdict(
+            lambda: asyncio.Semaphore(self.max_per_host)
+        )
+        self.bucket = TokenBucket(
+            requests_per_second
+        ) if requests_per_second else None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.wait_time = 0.0
+
+    async def acquire(self, url):
+        """Занимает слот для запроса к url."""
+        started = time.monotonic()
+        host_semaphore = self.host_semaphores[urlsplit(url).hostname or '']
+        await host_semaphore.acquire()
+        try:
+            await self.global_semaphore.acquire()
+            try:
+                if self.bucket:
+                    await self.bucket.acquire()
+            except BaseException:
+                self.global_semaphore.release()
+                raise
+        except BaseException:
+            host_semaphore.release()
+            raise
+        self.wait_time += time.monotonic() - started
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(self, url):
+        """Освобождает слот запроса к url."""
+        self.in_flight -= 1
+        self.global_semaphore.release()
+        self.host_semaphores[urlsplit(url).hostname or ''].release()
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Занимает слот для запроса к url на время его выполнения."""
+        await self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    def attempt_slot(self, url, breaker=None):
+        """Хук для RetryPolicy.request: слот на каждую попытку запроса."""
+        return ScheduledAttempt(self, url, breaker)
+
+    def as_dict(self):
+        """Возвращает статистику планировщика."""
+        return {
+            'requests': self.requests,
+            'peak_in_flight': self.peak_in_flight,
+            'hosts': len(self.host_semaphores),
+            'avg_wait': round(self.wait_time / self.requests, 3)
+            if self.requests else 0.0,
+        }
+
+
+class CircuitOpenError(Exception):
+    """Запрос не отправлен: цепь для хоста разомкнута."""
+
+
+class ScheduledAttempt:
+    """Слот планировщика и проверка размыкателя для каждой попытки.
+
+    Паузы RetryPolicy между попытками не держат ни глобальный слот, ни
+    слот хоста, а размыкатель проверяется и узнает исход каждой попытки.
+    """
+
+    def __init__(self, scheduler, url, breaker=None):
+        self.scheduler = scheduler
+        self.url = url
+        self.breaker = breaker
+
+    async def acquire(self):
+        """Занимает слот и проверяет, что цепь для хоста замкнута."""
+        await self.scheduler.acquire(self.url)
+        if self.breaker and not self.breaker.allow(self.url):
+            self.scheduler.release(self.url)
+            raise CircuitOpenError(self.url)
+
+    def release(self, started, status=None, error=None, retry_after=None):
+        """Освобождает слот и сообщает исход попытки размыкателю."""
+        self.scheduler.release(self.url)
+        if not self.breaker:
+            return
+        if isinstance(error, CONNECTION_ERRORS):
+            self.breaker.record_failure(self.url)
+        elif status is not None:
+            self.breaker.record_success(self.url)
+
+
+class AdaptiveLimiter:
+    """Адаптивный лимит параллельных запросов по алгоритму AIMD.
+
+    Лимит растет на единицу за каждые limit ответов, пока он полностью
+    занят, а p95 задержки и доля ошибок в скользящем окне в норме. На 429,
+    5xx и таймаутах лимит умножается на backoff, не чаще раза в cooldown
+    секунд, чтобы одна волна ошибок не обрушила его до минимума.
+
+    Для множества независимых хостов overload_statuses сужают до явных
+    сигналов перегрузки, а count_errors=False исключает таймауты и ошибки
+    соединения из окна: мертвый или медленный сайт говорит о себе, а не
+    о нагрузке на общий лимит.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 50,
+        target_latency: float = 2.0,
+        max_error_rate: float = 0.05,
+        backoff: float = 0.5,
+        cooldown: float = 1.0,
+        window: int = 100,
+        overload_statuses=OVERLOAD_STATUSES,
+        count_errors: bool = True
+    ):
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.overload_statuses = frozenset(overload_statuses)
+        self.count_errors = count_errors
+        self.samples = deque(maxlen=window)
+        self.waiters = deque()
+        self.in_flight = 0
+        self.decreased_at = float('-inf')
+        self.stats = {
+            'increased': 0, 'decreased': 0, 'peak_limit': int(self.limit)
+        }
+
+    def _has_capacity(self):
+        return self.in_flight < int(self.limit)
+
+    def _wake(self):
+        while self.waiters and self._has_capacity():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self):
+        """Ждет свободного места в пределах текущего лимита."""
+        if self._has_capacity() and not self.waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def p95_latency(self):
+        """Возвращает 95-й перцентиль задержки в окне."""
+        if not self.samples:
+            return 0.0
+        latencies = sorted(latency for latency, _ in self.samples)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def error_rate(self):
+        """Возвращает долю ошибок в окне."""
+        if not self.samples:
+            return 0.0
+        return sum(failed for _, failed in self.samples) / len(self.samples)
+
+    def _healthy(self):
+        return (
+            len(self.samples) >= min(10, self.samples.maxlen)
+            and self.error_rate() <= self.max_error_rate
+            and self.p95_latency() <= self.target_latency
+        )
+
+    def release(self, started, status=None, error=None, retry_after=None):
+        """Освобождает место и подстраивает лимит по исходу запроса."""
+        overloaded = status in self.overload_statuses or (
+            self.count_errors and isinstance(error, asyncio.TimeoutError)
+        )
+        if not isinstance(error, asyncio.CancelledError) and (
+            self.count_errors or error is None
+        ):
+            self.samples.append((
+                time.monotonic() - started,
+                overloaded or isinstance(error, CONNECTION_ERRORS)
+            ))
+        now = time.monotonic()
+        if overloaded:
+            if now - self.decreased_at >= self.cooldown:
+                self.decreased_at = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.stats['decreased'] += 1
+        elif error is None and not self._has_capacity() and self._healthy():
+            previous = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if int(self.limit) > previous:
+                self.stats['increased'] += 1
+                self.stats['peak_limit'] = max(
+                    self.stats['peak_limit'], int(self.limit)
+                )
+        self.in_flight -= 1
+        self._wake()
+
+    def as_dict(self):
+        """Возвращает текущий лимит и статистику его изменений."""
+        return {
+            **self.stats,
+            'limit': int(self.limit),
+            'p95_latency': round(self.p95_latency(), 3),
+            'error_rate': round(self.error_rate(), 3),
+        }
+
+
+class HostCircuitBreaker:
+    """Размыкатель цепи по хостам с сохранением недоступных хостов."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 300,
+        cache=None,
+        dead_ttl: float = 86400
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.cache = cache
+        self.dead_ttl = dead_ttl
+        self.failures = defaultdict(int)
+        self.opened_at = {}
+        self.checked = set()
+        self.stats = {'opened': 0, 'restored': 0, 'short_circuited': 0}
+
+    @staticmethod
+    def host(url):
+        return urlsplit(url).hostname or ''
+
+    def allow(self, url):
+        """Проверяет, можно ли отправлять запрос к хосту."""
+        host = self.host(url)
+        if host not in self.checked:
+            self.checked.add(host)
+            if self.cache and self.cache.get(host):
+                self.opened_at[host] = time.monotonic()
+                self.stats['restored'] += 1
+        opened_at = self.opened_at.get(host)
+        if opened_at is None:
+            return True
+        if time.monotonic() - opened_at >= self.reset_timeout:
+            self.opened_at[host] = time.monotonic()
+            return True
+        self.stats['short_circuited'] += 1
+        return False
+
+    def record_success(self, url):
+        """Сбрасывает счетчик ошибок после успешного ответа."""
+        host = self.host(url)
+        self.failures.pop(host, None)
+        if self.opened_at.pop(host, None) is not None and self.cache:
+            self.cache.delete(host)
+
+    def record_failure(self, url):
+        """Учитывает сетевую ошибку и размыкает цепь при превышении порога."""
+        host = self.host(url)
+        self.failures[host] += 1
+        if self.failures[host] < self.failure_threshold:
+            return
+        if host not in self.opened_at:
+            self.stats['opened'] += 1
+            if self.cache:
+                self.cache.set(host, True, ttl=self.dead_ttl)
+        self.opened_at[host] = time.monotonic()
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+import src.cache
+from src.cache import HTTPCache, TTLCache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.cache, 'CACHE_DIR', tmp_path)
+    return tmp_path
+
+
+def committed_rows(path, table):
+    with sqlite3.connect(path) as connection:
+        return connection.execute(
+            f'SELECT COUNT(*) FROM {table}'
+        ).fetchone()[0]
+
+
+def test_ttl_cache_commits_in_batches(cache_dir):
+    cache = TTLCache('entries.sqlite3', commit_every=3)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    assert committed_rows(cache_dir / 'entries.sqlite3', 'entries') == 0
+    cache.set('c', 3)
+    assert committed_rows(cache_dir / 'entries.sqlite3', 'entries') == 3
+    cache.set('d', 4)
+    cache.close()
+    reopened = TTLCache('entries.sqlite3', preload=True)
+    assert reopened.get('d') == 4
+    reopened.close()
+
+
+def test_http_cache_hit_does_not_write_until_touch_interval(cache_dir):
+    cache = HTTPCache('http.sqlite3')
+    cache.set('url', 200, b'body', 'utf-8')
+    changes = cache.connection.total_changes
+    for _ in range(10):
+        assert cache.get('url')['body'] == b'body'
+    assert cache.connection.total_changes == changes
+    cache.touch_interval = 0
+    cache.get('url')
+    assert cache.connection.total_changes == changes + 1
+    cache.close()
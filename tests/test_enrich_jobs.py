@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from src.enrich_jobs import HHSupportAnalyzer
+
+EMPLOYER_VACANCIES = {
+    'e1': [
+        ('Оператор call-центра', 'Сменный график 2/2, входящие звонки'),
+        ('Специалист технической поддержки L1', 'Работа 24/7 в чате'),
+    ],
+    'e2': [
+        ('Разработчик python', 'Пишем бэкенд'),
+        ('Менеджер по продажам', 'Холодные звонки'),
+        ('Оператор контакт-центра', 'Обработка обращений клиентов'),
+        ('Специалист поддержки клиентов', 'Линия 1, телефон и чат'),
+        ('Менеджер по работе с клиентами', 'Поддержка и без продаж'),
+    ],
+}
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return HHSupportAnalyzer()
+
+
+@pytest.fixture
+def vacancies():
+    """Кадр из pd.concat по работодателям: индекс повторяется."""
+    return pd.concat([
+        pd.DataFrame(
+            [
+                {'employer_id': employer, 'title': title, 'snippet': snippet}
+                for title, snippet in rows
+            ]
+        )
+        for employer, rows in EMPLOYER_VACANCIES.items()
+    ])
+
+
+def test_classify_frame_matches_rows_with_duplicate_index(
+    analyzer, vacancies
+):
+    assert not vacancies.index.is_unique
+    frame = analyzer.classify_vacancies_frame(vacancies)
+    assert frame.index.equals(vacancies.index)
+    for position, (title, snippet) in enumerate(
+        zip(vacancies['title'], vacancies['snippet'])
+    ):
+        row = frame.iloc[position]
+        assert row['is_support'] == analyzer.support_vacancy(
+            title, snippet
+        )[0]
+        for column, value in analyzer.analyze_vacancy_quality(
+            title, snippet
+        ).items():
+            got = row[column]
+            assert (None if pd.isna(got) else got) == value
+
+
+def test_classify_frame_support_only_keeps_original_labels(
+    analyzer, vacancies
+):
+    frame = analyzer.classify_vacancies_frame(vacancies, support_only=True)
+    expected = vacancies[[
+        analyzer.support_vacancy(title, snippet)[0]
+        for title, snippet in zip(vacancies['title'], vacancies['snippet'])
+    ]]
+    assert frame.index.equals(expected.index)
+    assert frame['title'].tolist() == expected['title'].tolist()
+
+
+def test_score_employers_frame_matches_vacancies_set(analyzer, vacancies):
+    scores = analyzer.score_employers_frame(vacancies)
+    for employer, rows in EMPLOYER_VACANCIES.items():
+        expected = analyzer.analyze_vacancies_set([
+            {'title': title, 'snippet': snippet}
+            for title, snippet in rows
+            if analyzer.support_vacancy(title, snippet)[0]
+        ])
+        assert not expected['is_level_a']
+        for column in (
+            'score', 'team_size', 'vacancy_count', 'unique_roles',
+            'shift_work', 'mentions_24_7'
+        ):
+            assert scores.loc[employer, column] == expected[column]
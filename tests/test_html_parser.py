@@ -0,0 +1,84 @@
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from src.enrich_sites import VACANCY_BLOCK_KEYWORDS, extract_page_features
+from src.html_parser import PARSER_BACKENDS, lxml_html, parse_page
+
+FIXTURES = sorted((Path(__file__).parent / 'fixtures' / 'html').glob('*.html'))
+BACKENDS = [
+    backend for backend in PARSER_BACKENDS
+    if backend != 'lxml' or lxml_html is not None
+]
+COMPARED_FIELDS = ('visible_text', 'links', 'has_form', 'headings', 'blocks')
+
+
+def parse(fixture, backend):
+    return parse_page(
+        fixture.read_text(encoding='utf-8'), backend, VACANCY_BLOCK_KEYWORDS
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS[1:])
+@pytest.mark.parametrize('fixture', FIXTURES, ids=lambda path: path.stem)
+def test_backends_give_same_page(fixture, backend):
+    expected = asdict(parse(fixture, BACKENDS[0]))
+    page = asdict(parse(fixture, backend))
+    for name in COMPARED_FIELDS:
+        assert page[name] == expected[name], name
+
+
+@pytest.mark.parametrize('backend', BACKENDS[1:])
+@pytest.mark.parametrize('fixture', FIXTURES, ids=lambda path: path.stem)
+def test_backends_give_same_features(fixture, backend):
+    url = 'https://example.ru/'
+    assert extract_page_features(parse(fixture, backend), url) == (
+        extract_page_features(parse(fixture, BACKENDS[0]), url)
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_textarea_and_title_are_text(backend):
+    page = parse(Path(FIXTURES[0].parent / 'raw_text.html'), backend)
+    assert [href for _, href in page.links] == [
+        '/template-link', '/after'
+    ]
+    assert 'Форма & <b>обратной</b> связи' in page.visible_text
+    assert '<a href="/textarea-link">ссылка</a> & <b>текст</b> <b>' in (
+        page.visible_text
+    )
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_nested_link_closes_outer_link(backend):
+    page = parse_page(
+        '<p><a href="/one">Первая <a href="/two">вторая</a> ссылка</a></p>',
+        backend
+    )
+    assert page.links == [('Первая', '/one'), ('вторая', '/two')]
+
+
+HIDDEN_EMAILS = (
+    '<html><head><style>/* support@style.ru */</style>'
+    '<script>var owner = "support@script.ru";</script></head>'
+    '<body data-owner="support@attribute.ru"><!-- support@comment.ru -->'
+    '<img src="/logo.png" alt="support@alt.ru">{body}</body></html>'
+)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('body, email', [
+    ('<p>Пишите: info@example.ru</p>', 'info@example.ru'),
+    (
+        '<p>Пишите: info@example.ru</p>'
+        '<a href="mailto:help@example.ru">Поддержка</a>',
+        'help@example.ru'
+    ),
+    ('<p>Контакты</p>', ''),
+])
+def test_email_only_from_visible_text_and_mailto(backend, body, email):
+    page = parse_page(HIDDEN_EMAILS.format(body=body), backend)
+    features = extract_page_features(page, 'https://example.ru/')
+    assert features['support_email'] == email
+    assert features['has_support_email'] is bool(email)
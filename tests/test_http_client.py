@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.http_client import CharsetDetector, read_limited
+
+PAGE = ('<html><body>' + 'Служба поддержки работает круглосуточно. ' * 50
+        + '</body></html>').encode('utf-8')
+MID_CHARACTER_CUTS = [
+    size for size in range(1000, 1010) if PAGE[size] & 0xC0 == 0x80
+] + [len(PAGE) - 17]
+
+
+class FakeContent:
+    def __init__(self, body, chunk_size):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+class FakeResponse:
+    def __init__(self, body, chunk_size=100):
+        self.content = FakeContent(body, chunk_size)
+
+
+def detect(body, max_bytes, declared=None):
+    detector = CharsetDetector(declared)
+    content = asyncio.run(
+        read_limited(FakeResponse(body), max_bytes, detector)
+    )
+    return content, detector.close()
+
+
+@pytest.mark.parametrize('max_bytes', MID_CHARACTER_CUTS)
+def test_cut_inside_utf8_character_keeps_utf8(max_bytes):
+    content, encoding = detect(PAGE, max_bytes)
+    with pytest.raises(UnicodeDecodeError):
+        content.decode('utf-8')
+    assert encoding == 'utf-8'
+
+
+def test_complete_utf8_page():
+    content, encoding = detect(PAGE, len(PAGE) * 2)
+    assert content == PAGE
+    assert encoding == 'utf-8'
+
+
+def test_incomplete_utf8_at_real_end_falls_back():
+    assert detect(PAGE[:-17], len(PAGE))[1] == 'cp1251'
+
+
+def test_cp1251_page():
+    body = PAGE.decode('utf-8').encode('cp1251')
+    assert detect(body, len(body) - 1)[1] == 'cp1251'
+
+
+def test_declared_charset_wins():
+    assert detect(PAGE, 100, declared='koi8-r')[1] == 'koi8-r'
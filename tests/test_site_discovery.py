@@ -0,0 +1,104 @@
+import gzip
+
+from src.enrich_sites import (
+    FAQ_PATH_KEYWORDS,
+    JOB_PATH_KEYWORDS,
+    SUPPORT_PATH_KEYWORDS
+)
+from src.site_discovery import (
+    classify_urls,
+    MAX_SITEMAP_URLS,
+    parse_sitemap,
+    SITEMAP_CHUNK_BYTES
+)
+
+CATEGORIES = {
+    'jobs': JOB_PATH_KEYWORDS,
+    'support': SUPPORT_PATH_KEYWORDS,
+    'faq': FAQ_PATH_KEYWORDS
+}
+
+
+def classify(*paths):
+    return classify_urls(
+        [f'https://example.ru{path}' for path in paths], CATEGORIES
+    )
+
+
+def test_broad_words_do_not_win_categories():
+    found = classify(
+        '/services/', '/care/', '/phone/', '/contacts/support/',
+        '/work/', '/team/', '/schedule/', '/salary/', '/vacancies/'
+    )
+    assert found == {
+        'support': 'https://example.ru/contacts/support/',
+        'jobs': 'https://example.ru/vacancies/'
+    }
+
+
+def test_shallowest_matching_path_wins():
+    found = classify(
+        '/about/careers/', '/careers/', '/help/', '/help/faq/'
+    )
+    assert found == {
+        'jobs': 'https://example.ru/careers/',
+        'support': 'https://example.ru/help/',
+        'faq': 'https://example.ru/help/faq/'
+    }
+
+
+def test_cyrillic_paths_are_matched():
+    found = classify(
+        '/%D0%B2%D0%BE%D0%BF%D1%80%D0%BE%D1%81%D1%8B-'
+        '%D0%BE%D1%82%D0%B2%D0%B5%D1%82%D1%8B/',
+        '/%D0%B2%D0%B0%D0%BA%D0%B0%D0%BD%D1%81%D0%B8%D0%B8/'
+    )
+    assert set(found) == {'faq', 'jobs'}
+
+
+def test_unrelated_site_has_no_categories():
+    assert classify('/services/', '/products/item-1/', '/news/') == {}
+
+
+def sitemap(paths, host='example.ru'):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(
+            f'<url><loc>https://{host}{path}</loc></url>' for path in paths
+        )
+        + '</urlset>'
+    ).encode('utf-8')
+
+
+def test_gzip_sitemap_is_parsed_in_chunks():
+    paths = [f'/catalog/item-{index}/' for index in range(5000)]
+    content = gzip.compress(sitemap(paths))
+    assert len(gzip.decompress(content)) > SITEMAP_CHUNK_BYTES
+    urls, children = parse_sitemap(content)
+    assert children == []
+    assert urls == [f'https://example.ru{path}' for path in paths]
+
+
+def test_sitemap_stops_at_url_cap():
+    paths = [f'/p/{index}' for index in range(MAX_SITEMAP_URLS + 10)]
+    urls, _ = parse_sitemap(sitemap(paths))
+    assert len(urls) == MAX_SITEMAP_URLS
+
+
+def test_sitemap_keeps_only_same_site_pages():
+    content = sitemap(['/careers/']).replace(
+        b'</urlset>', b'<url><loc>https://other.ru/x</loc></url></urlset>'
+    )
+    urls, _ = parse_sitemap(content, 'https://www.example.ru/')
+    assert urls == ['https://example.ru/careers/']
+
+
+def test_sitemap_index_returns_children():
+    content = (
+        b'<sitemapindex><sitemap><loc>https://example.ru/s1.xml</loc>'
+        b'</sitemap></sitemapindex>'
+    )
+    assert parse_sitemap(content, 'https://example.ru/') == (
+        [], ['https://example.ru/s1.xml']
+    )
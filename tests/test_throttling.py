@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from src.retry import RetryPolicy
+from src.throttling import AdaptiveLimiter, SITE_OVERLOAD_STATUSES
+
+
+def site_limiter():
+    return AdaptiveLimiter(
+        initial=8, max_limit=8, overload_statuses=SITE_OVERLOAD_STATUSES,
+        count_errors=False, cooldown=0
+    )
+
+
+def release_all(limiter, outcomes):
+    async def run():
+        for outcome in outcomes:
+            await limiter.acquire()
+            limiter.release(time.monotonic(), **outcome)
+    asyncio.run(run())
+
+
+def test_site_limiter_ignores_dead_and_slow_hosts():
+    limiter = site_limiter()
+    release_all(limiter, [
+        {'error': asyncio.TimeoutError()},
+        {'error': ConnectionResetError()},
+        {'status': 500},
+        {'status': 502},
+    ] * 5)
+    assert limiter.limit == 8
+    assert limiter.error_rate() == 0
+
+
+def test_site_limiter_backs_off_on_explicit_overload():
+    limiter = site_limiter()
+    release_all(limiter, [{'status': 429}, {'status': 503}])
+    assert limiter.limit == 2
+
+
+def test_default_limiter_backs_off_on_timeouts():
+    limiter = AdaptiveLimiter(initial=8, max_limit=8, cooldown=0)
+    release_all(limiter, [{'error': asyncio.TimeoutError()}])
+    assert limiter.limit == 4
+
+
+class Recorder:
+    def __init__(self, name, order):
+        self.name = name
+        self.order = order
+
+    async def acquire(self):
+        self.order.append(self.name)
+
+    def release(self, started, status=None, error=None, retry_after=None):
+        pass
+
+
+class Response:
+    status = 200
+    headers = {}
+
+    def release(self):
+        pass
+
+
+class Session:
+    async def request(self, method, url, **kwargs):
+        return Response()
+
+
+def test_limiter_is_acquired_before_scheduler_slot():
+    order = []
+
+    async def run():
+        async with RetryPolicy().request(
+            Session(), 'GET', 'https://example.ru/',
+            limiter=Recorder('limiter', order),
+            slot=Recorder('slot', order),
+            rate_limiter=Recorder('rate_limiter', order)
+        ):
+            pass
+    asyncio.run(run())
+    assert order == ['limiter', 'slot', 'rate_limiter']